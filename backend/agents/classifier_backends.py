@@ -0,0 +1,175 @@
+import os
+import logging
+from typing import Callable, Dict, List, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Zero-shot event-type classifier settings
+NLP_CLASSIFIER_BACKEND = os.getenv("NLP_CLASSIFIER_BACKEND", "pytorch")  # pytorch, quantized, onnx, distilled, embedding
+NLP_CLASSIFIER_MODEL = os.getenv("NLP_CLASSIFIER_MODEL", "facebook/bart-large-mnli")
+NLP_DISTILLED_MODEL = os.getenv("NLP_DISTILLED_MODEL", "valhalla/distilbart-mnli-12-3")
+NLP_ONNX_MODEL_DIR = os.getenv(
+    "NLP_ONNX_MODEL_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "onnx")
+)
+NLP_ONNX_QUANTIZE = os.getenv("NLP_ONNX_QUANTIZE", "true").lower() in ["1", "true", "yes"]
+NLP_EMBEDDING_MODEL = os.getenv("NLP_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+NLP_EMBEDDING_BATCH_SIZE = int(os.getenv("NLP_EMBEDDING_BATCH_SIZE", "32"))  # texts per forward pass
+
+# What each event type means, embedded once and compared against every event by the embedding backend
+EVENT_TYPE_DESCRIPTIONS = {
+    "music": "a music event such as a concert, live band, DJ night or musical performance",
+    "tech": "a technology event such as a tech conference, hackathon, developer meetup or startup pitch",
+    "sports": "a sports event such as a match, tournament, marathon, race or fitness competition",
+    "education": "an educational event such as a workshop, seminar, lecture, course or training session",
+    "food": "a food and drink event such as a food festival, tasting, cooking class or culinary fair",
+    "art": "an art event such as an art exhibition, gallery opening, painting or sculpture show",
+    "business": "a business event such as a trade show, networking session, expo or corporate summit",
+    "cultural": "a cultural event such as a traditional festival, religious celebration, perahera or heritage event",
+    "fashion": "a fashion event such as a fashion show, runway, designer showcase or clothing launch",
+    "comedy": "a comedy event such as a stand-up comedy show or comedy night",
+    "theater": "a theater event such as a stage play, drama, musical theater or dance performance",
+    "photography": "a photography event such as a photo exhibition, photo walk or photography workshop",
+    "visual": "a virtual or online event such as a webinar, live stream or video call",
+    "other": "a general community gathering or miscellaneous event",
+}
+
+
+def _load_pytorch(model_name: str):
+    """Full-precision PyTorch model (the original behaviour)."""
+    from transformers import pipeline
+    return pipeline("zero-shot-classification", model=model_name)
+
+def _load_quantized(model_name: str):
+    """PyTorch model with its Linear layers dynamically quantized to int8."""
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer, pipeline
+    model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    return pipeline("zero-shot-classification", model=model, tokenizer=tokenizer)
+
+def _load_onnx(model_name: str):
+    """ONNX Runtime export of the model, int8-quantized unless NLP_ONNX_QUANTIZE is off.
+
+    The export is written to NLP_ONNX_MODEL_DIR on first use and reused afterwards.
+    Requires ``optimum[onnxruntime]``.
+    """
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer, pipeline
+
+    export_dir = os.path.join(NLP_ONNX_MODEL_DIR, model_name.replace("/", "__"))
+    if not os.path.exists(os.path.join(export_dir, "model.onnx")):
+        logger.info(f"Exporting {model_name} to ONNX in {export_dir}")
+        model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+        model.save_pretrained(export_dir)
+        AutoTokenizer.from_pretrained(model_name).save_pretrained(export_dir)
+
+    file_name = "model.onnx"
+    if NLP_ONNX_QUANTIZE:
+        file_name = "model_quantized.onnx"
+        if not os.path.exists(os.path.join(export_dir, file_name)):
+            logger.info(f"Quantizing ONNX export of {model_name} to int8")
+            quantizer = ORTQuantizer.from_pretrained(export_dir, file_name="model.onnx")
+            quantizer.quantize(save_dir=export_dir, quantization_config=AutoQuantizationConfig.avx2(is_static=False, per_channel=False))
+
+    model = ORTModelForSequenceClassification.from_pretrained(export_dir, file_name=file_name)
+    tokenizer = AutoTokenizer.from_pretrained(export_dir)
+    return pipeline("zero-shot-classification", model=model, tokenizer=tokenizer)
+
+def _load_distilled(model_name: str):
+    """Smaller distilled NLI model; ignores the configured full-size model."""
+    from transformers import pipeline
+    return pipeline("zero-shot-classification", model=NLP_DISTILLED_MODEL)
+
+
+class EmbeddingClassifier:
+    """Zero-shot classification by cosine similarity of sentence embeddings.
+
+    Each event is embedded once and compared with precomputed label-description
+    embeddings, so cost does not grow with the number of labels. Called like
+    the transformers zero-shot pipeline and returns the same result format.
+    """
+
+    # Cosine similarities sit in a narrow band; scale them before the softmax so scores look like pipeline probabilities
+    SCORE_SCALE = 20.0
+
+    def __init__(self, model_name: str = NLP_EMBEDDING_MODEL, labels: List[str] = None, batch_size: int = NLP_EMBEDDING_BATCH_SIZE):
+        from transformers import AutoModel, AutoTokenizer
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModel.from_pretrained(model_name).eval()
+        self.batch_size = max(1, batch_size)
+        self._label_vectors: Dict[Tuple[str, ...], object] = {}
+        # Precompute the label vectors up front so the first classification does not pay for them
+        self.label_vectors(labels or list(EVENT_TYPE_DESCRIPTIONS))
+
+    def embed(self, texts: List[str]):
+        """L2-normalised mean-pooled embeddings, one row per text."""
+        import numpy as np
+        import torch
+        rows = []
+        for start in range(0, len(texts), self.batch_size):
+            encoded = self.tokenizer(texts[start:start + self.batch_size], padding=True, truncation=True, max_length=256, return_tensors="pt")
+            with torch.no_grad():
+                hidden = self.model(**encoded).last_hidden_state
+            mask = encoded["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+            rows.append(((hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)).numpy())
+        vectors = np.vstack(rows) if rows else np.zeros((0, 0), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def label_vectors(self, labels: List[str]):
+        key = tuple(labels)
+        if key not in self._label_vectors:
+            self._label_vectors[key] = self.embed([EVENT_TYPE_DESCRIPTIONS.get(label, f"a {label} event") for label in labels])
+        return self._label_vectors[key]
+
+    def __call__(self, inputs, candidate_labels: List[str], multi_label: bool = False, batch_size: int = None):
+        import numpy as np
+        texts = [inputs] if isinstance(inputs, str) else list(inputs)
+        # (events x labels) cosine similarities in one matrix product
+        similarities = self.embed(texts) @ self.label_vectors(candidate_labels).T
+        if multi_label:
+            scores = (similarities + 1) / 2
+        else:
+            exp = np.exp((similarities - similarities.max(axis=1, keepdims=True)) * self.SCORE_SCALE)
+            scores = exp / exp.sum(axis=1, keepdims=True)
+        order = np.argsort(-scores, axis=1, kind="stable")
+        results = [
+            {
+                "sequence": text,
+                "labels": [candidate_labels[j] for j in order[i]],
+                "scores": [float(scores[i, j]) for j in order[i]]
+            }
+            for i, text in enumerate(texts)
+        ]
+        return results[0] if isinstance(inputs, str) else results
+
+def _load_embedding(model_name: str):
+    """Sentence-embedding similarity classifier; ignores the configured NLI model."""
+    return EmbeddingClassifier(NLP_EMBEDDING_MODEL)
+
+
+CLASSIFIER_BACKENDS: Dict[str, Callable] = {
+    "pytorch": _load_pytorch,
+    "quantized": _load_quantized,
+    "onnx": _load_onnx,
+    "distilled": _load_distilled,
+    "embedding": _load_embedding,
+}
+
+def register_classifier_backend(name: str, loader: Callable) -> None:
+    CLASSIFIER_BACKENDS[name] = loader
+
+def build_classifier(backend: str = NLP_CLASSIFIER_BACKEND, model_name: str = NLP_CLASSIFIER_MODEL):
+    """Build a zero-shot classification pipeline with the given backend.
+
+    Every backend returns a callable with the transformers zero-shot pipeline
+    interface, so nlp_agent does not care which one is in use.
+    """
+    if backend not in CLASSIFIER_BACKENDS:
+        raise ValueError(f"Unknown classifier backend '{backend}'; choose one of {', '.join(CLASSIFIER_BACKENDS)}")
+    logger.info(f"Loading zero-shot classifier with the {backend} backend")
+    return CLASSIFIER_BACKENDS[backend](model_name)
@@ -0,0 +1,119 @@
+"""Compare event-type classifier backends on a labeled sample.
+
+Reports accuracy against the labels, agreement with the first backend, load
+time, per-event latency and resident memory growth for each backend:
+
+    python -m agents.classifier_eval --sample labeled.jsonl --backends pytorch quantized onnx
+    python -m agents.classifier_eval --from-db 200 --backends pytorch distilled
+
+A sample file is JSON, JSON lines or CSV with ``text`` and ``label`` fields and
+an optional ``location``. With ``--from-db`` the labels are the event types
+already stored by the current backend, so accuracy reads as agreement with it.
+"""
+import gc
+import csv
+import json
+import time
+import argparse
+import logging
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from agents.classifier_backends import CLASSIFIER_BACKENDS, build_classifier, NLP_CLASSIFIER_BACKEND
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _rss_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+def load_sample(path: str) -> List[Dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            rows = list(csv.DictReader(f))
+        else:
+            content = f.read().strip()
+            rows = json.loads(content) if content.startswith("[") else [json.loads(line) for line in content.splitlines() if line.strip()]
+    return [
+        {"text": row["text"], "location": row.get("location") or "", "label": row["label"]}
+        for row in rows if row.get("text") and row.get("label")
+    ]
+
+def load_sample_from_db(limit: int) -> List[Dict]:
+    from db.database import SessionLocal
+    from db.models import Event
+    from agents.nlp_agent import event_nlp_text
+    db = SessionLocal()
+    try:
+        events = db.query(Event).filter(Event.event_type.isnot(None)).order_by(Event.id.desc()).limit(limit).all()
+        return [{"text": event_nlp_text(event), "location": event.location or "", "label": event.event_type} for event in events]
+    finally:
+        db.close()
+
+def evaluate_backend(backend: str, sample: List[Dict], batch_size: int) -> Dict:
+    from agents.nlp_agent import classify_event_types
+    rss_before = _rss_mb()
+    started = time.perf_counter()
+    classifier = build_classifier(backend)
+    load_seconds = time.perf_counter() - started
+    rss_loaded = _rss_mb()
+
+    texts = [row["text"] for row in sample]
+    locations = [row["location"] for row in sample]
+    started = time.perf_counter()
+    predictions = classify_event_types(texts, locations, batch_size=batch_size, classifier=classifier)
+    classify_seconds = time.perf_counter() - started
+
+    correct = sum(1 for row, prediction in zip(sample, predictions) if prediction == row["label"])
+    result = {
+        "backend": backend,
+        "accuracy": round(correct / len(sample), 4) if sample else None,
+        "load_seconds": round(load_seconds, 2),
+        "ms_per_event": round(classify_seconds * 1000 / len(sample), 1) if sample else None,
+        "rss_growth_mb": round(rss_loaded - rss_before, 1) if rss_before is not None and rss_loaded is not None else None,
+        "predictions": predictions
+    }
+    del classifier
+    gc.collect()
+    return result
+
+def compare_backends(sample: List[Dict], backends: List[str], batch_size: int) -> Dict:
+    results = [evaluate_backend(backend, sample, batch_size) for backend in backends]
+    baseline = results[0]["predictions"] if results else []
+    for result in results:
+        agreeing = sum(1 for a, b in zip(baseline, result["predictions"]) if a == b)
+        result["agreement_with_" + backends[0]] = round(agreeing / len(baseline), 4) if baseline else None
+        del result["predictions"]
+    return {"status": "success", "sample_size": len(sample), "batch_size": batch_size, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare zero-shot classifier backends")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--sample", help="labeled sample file (.json, .jsonl or .csv)")
+    source.add_argument("--from-db", type=int, metavar="N", help="use the N latest events that already have an event_type")
+    parser.add_argument("--backends", nargs="+", choices=list(CLASSIFIER_BACKENDS), default=list(dict.fromkeys(["pytorch", NLP_CLASSIFIER_BACKEND])),
+                        help="backends to compare; the first one is the baseline for agreement")
+    parser.add_argument("--batch-size", type=int, default=8)
+    args = parser.parse_args()
+
+    sample = load_sample(args.sample) if args.sample else load_sample_from_db(args.from_db)
+    if not sample:
+        print("No labeled events to evaluate")
+        return
+    # Memory freed by one backend is not always returned to the OS; run one backend per process for exact RSS figures
+    print(json.dumps(compare_backends(sample, args.backends, args.batch_size), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+import os
+import re
+import json
+import time
+import asyncio
+import hashlib
+import importlib.util
+import logging
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+import httpx
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Crawler settings
+CRAWLER_CACHE_DIR = os.getenv(
+    "CRAWLER_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "pages")
+)
+CRAWLER_PER_HOST_CONCURRENCY = int(os.getenv("CRAWLER_PER_HOST_CONCURRENCY", "2"))
+CRAWLER_HOST_DELAY_SECONDS = float(os.getenv("CRAWLER_HOST_DELAY_SECONDS", "1.0"))
+CRAWLER_TIMEOUT_SECONDS = float(os.getenv("CRAWLER_TIMEOUT_SECONDS", "30"))
+CRAWLER_MAX_CONNECTIONS = int(os.getenv("CRAWLER_MAX_CONNECTIONS", "20"))
+CRAWLER_MAX_TEXT_CHARS = int(os.getenv("CRAWLER_MAX_TEXT_CHARS", "12000"))
+CRAWLER_USER_AGENT = os.getenv("CRAWLER_USER_AGENT", "EventCultureBot/1.0 (+event discovery for Sri Lanka)")
+
+# httpx only speaks HTTP/2 when the optional h2 package is installed
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class _MainTextExtractor(HTMLParser):
+    """Collect visible text, dropping scripts, styles and page chrome."""
+
+    SKIP_TAGS = {"script", "style", "noscript", "svg", "nav", "header", "footer", "aside", "form", "iframe", "template"}
+    MAIN_TAGS = {"main", "article"}
+    BLOCK_TAGS = {"p", "div", "section", "li", "tr", "br", "h1", "h2", "h3", "h4", "h5", "h6", "td", "th", "dd", "dt", "time"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.skip_depth = 0
+        self.main_depth = 0
+        self.all_parts: List[str] = []
+        self.main_parts: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self.skip_depth += 1
+        elif tag in self.MAIN_TAGS:
+            self.main_depth += 1
+        if tag in self.BLOCK_TAGS:
+            self._append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+        elif tag in self.MAIN_TAGS and self.main_depth:
+            self.main_depth -= 1
+        if tag in self.BLOCK_TAGS:
+            self._append("\n")
+
+    def handle_data(self, data):
+        if not self.skip_depth and data.strip():
+            self._append(data)
+
+    def _append(self, text: str):
+        self.all_parts.append(text)
+        if self.main_depth:
+            self.main_parts.append(text)
+
+
+def html_to_main_text(html: str, max_chars: int = CRAWLER_MAX_TEXT_CHARS) -> str:
+    """Reduce an HTML page to its main readable text before it is sent to the LLM."""
+    extractor = _MainTextExtractor()
+    try:
+        extractor.feed(html)
+        extractor.close()
+    except Exception as e:
+        logger.warning(f"[Crawler] HTML parsing failed, using raw text: {e}")
+        return re.sub(r"\s+", " ", re.sub(r"<[^>]+>", " ", html)).strip()[:max_chars]
+
+    # Prefer <main>/<article> content when the page marks it up
+    parts = extractor.main_parts if "".join(extractor.main_parts).strip() else extractor.all_parts
+    lines = []
+    for line in "".join(parts).split("\n"):
+        line = re.sub(r"[ \t\r\f\v]+", " ", line).strip()
+        if line and (not lines or lines[-1] != line):
+            lines.append(line)
+    return "\n".join(lines)[:max_chars]
+
+
+class PageCache:
+    """On-disk cache of reduced page text plus the validators needed to revalidate it."""
+
+    def __init__(self, directory: str = CRAWLER_CACHE_DIR):
+        self.directory = directory
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, url: str) -> Optional[Dict]:
+        try:
+            with open(self._path(url), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def set(self, url: str, entry: Dict) -> None:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = self._path(url) + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self._path(url))
+        except OSError as e:
+            logger.warning(f"[Crawler] Failed to cache {url}: {e}")
+
+
+class Crawler:
+    """Shared, pooled HTTP client with per-host politeness and conditional revalidation."""
+
+    def __init__(self, per_host_concurrency: int = CRAWLER_PER_HOST_CONCURRENCY, host_delay: float = CRAWLER_HOST_DELAY_SECONDS, cache: Optional[PageCache] = None):
+        self.per_host_concurrency = max(1, per_host_concurrency)
+        self.host_delay = host_delay
+        self.cache = cache or PageCache()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._host_last_request: Dict[str, float] = {}
+        self._host_locks: Dict[str, asyncio.Lock] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=_HTTP2_AVAILABLE,
+                timeout=CRAWLER_TIMEOUT_SECONDS,
+                follow_redirects=True,
+                headers={"User-Agent": CRAWLER_USER_AGENT},
+                limits=httpx.Limits(max_connections=CRAWLER_MAX_CONNECTIONS, max_keepalive_connections=CRAWLER_MAX_CONNECTIONS)
+            )
+        return self._client
+
+    def _host_semaphore(self, host: str) -> asyncio.Semaphore:
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.per_host_concurrency)
+        return self._host_semaphores[host]
+
+    async def _wait_for_host(self, host: str) -> None:
+        # Space out requests to the same host; the lock makes concurrent callers take turns
+        if host not in self._host_locks:
+            self._host_locks[host] = asyncio.Lock()
+        async with self._host_locks[host]:
+            wait = self._host_last_request.get(host, 0) + self.host_delay - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._host_last_request[host] = time.monotonic()
+
+    async def fetch(self, url: str) -> Dict:
+        """Fetch a page, revalidating any cached copy.
+
+        Returns a dict with the reduced ``text``, ``changed`` (False when the
+        server answered 304 Not Modified) and the HTTP ``status``.
+        """
+        host = urlparse(url).netloc
+        cached = self.cache.get(url)
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        async with self._host_semaphore(host):
+            await self._wait_for_host(host)
+            response = await self.client.get(url, headers=headers)
+
+        if response.status_code == 304 and cached:
+            logger.info(f"[Crawler] {url} not modified")
+            return {"url": url, "status": 304, "changed": False, "text": cached.get("text", "")}
+
+        response.raise_for_status()
+        text = html_to_main_text(response.text)
+        logger.info(f"[Crawler] {url}: reduced {len(response.text)} chars of HTML to {len(text)} chars of text")
+        self.cache.set(url, {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+            "text": text
+        })
+        return {"url": url, "status": response.status_code, "changed": True, "text": text}
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Shared crawler instance used by the agents
+crawler = Crawler()
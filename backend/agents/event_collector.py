@@ -1,15 +1,26 @@
 from fastapi import APIRouter
 from pydantic import ValidationError
-from typing import List
-import google.generativeai as genai
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+from sqlalchemy import bindparam, func, literal, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+import asyncio
 import json
-import httpx
+import re
+import hashlib
 import os
+import time
 import logging
 
 from db.database import SessionLocal
-from db.models import Event
+from db.models import Event, EventArchive
 from schema.event_agent_s import EventCreate
+from agents.llm_cache import response_cache, LLM_CACHE_DISABLED
+from agents.event_dedup import NearDuplicateIndex, compute_fingerprint
+from agents.crawler import crawler
+from agents.llm_gateway import LLM_MODEL_NAME
+from agents.single_flight import run_agent_once
+from agents.llm_json import generate_json, generate_json_sync, parse_json_response, matches_schema, EVENT_LIST_SCHEMA, keyed_event_lists_schema
+from agents.query_scheduler import select_due_queries, record_query_results, SCHEDULER_RUN_BUDGET
 
 router = APIRouter()
 logging.basicConfig(level=logging.INFO)
@@ -20,8 +31,7 @@ api_key = os.getenv("GEMINI_API_KEY")
 if not api_key:
     raise ValueError("GEMINI_API_KEY environment variable is required")
 
-genai.configure(api_key=api_key)
-model = genai.GenerativeModel("gemini-2.5-flash")
+LLM_AGENT_NAME = "event_collector"
 
 # Search queries for Sri Lankan events
 SEARCH_QUERIES = [
@@ -44,15 +54,80 @@ SEARCH_QUERIES = [
     "upcoming art exhibitions in sri lanka"
 ]
 
+# Collection mode settings ("concurrent" fans queries out, "sequential" runs them one by one)
+COLLECTOR_MODE = os.getenv("COLLECTOR_MODE", "concurrent")
+COLLECTOR_CONCURRENCY = int(os.getenv("COLLECTOR_CONCURRENCY", "5"))
+COLLECTOR_QUERY_TIMEOUT = float(os.getenv("COLLECTOR_QUERY_TIMEOUT", "60"))
+# Queries packed into one Gemini request (1 sends each query on its own)
+COLLECTOR_PROMPT_BATCH_SIZE = int(os.getenv("COLLECTOR_PROMPT_BATCH_SIZE", "4"))
+# Search providers to query, per-provider concurrency, and the JSON file served by the fixture provider
+COLLECTOR_PROVIDERS = [name.strip() for name in os.getenv("COLLECTOR_PROVIDERS", "Google Search,Bing Search").split(",") if name.strip()]
+# Default per-provider concurrency; override one provider with e.g. SEARCH_PROVIDER_CONCURRENCY_BING_SEARCH=2
+SEARCH_PROVIDER_CONCURRENCY = int(os.getenv("SEARCH_PROVIDER_CONCURRENCY", "5"))
+COLLECTOR_FIXTURE_PATH = os.getenv("COLLECTOR_FIXTURE_PATH", "")
+# Run only the queries the scheduler considers due, instead of every query on every collection
+COLLECTOR_SCHEDULED = os.getenv("COLLECTOR_SCHEDULED", "true").lower() in ["1", "true", "yes"]
+
+# Streaming mode settings: queue depth between pipeline stages and events per DB insert
+COLLECTOR_QUEUE_SIZE = int(os.getenv("COLLECTOR_QUEUE_SIZE", "4"))
+COLLECTOR_INSERT_BATCH_SIZE = int(os.getenv("COLLECTOR_INSERT_BATCH_SIZE", "10"))
+
+# Bulk upsert settings: rows per multi-row statement
+EVENT_UPSERT_CHUNK_SIZE = int(os.getenv("EVENT_UPSERT_CHUNK_SIZE", "500"))
+
+# Outdated-event cleanup settings: rows per chunk, pause between chunks, and whether to archive first
+CLEANUP_BATCH_SIZE = int(os.getenv("CLEANUP_BATCH_SIZE", "500"))
+CLEANUP_PAUSE_SECONDS = float(os.getenv("CLEANUP_PAUSE_SECONDS", "0.05"))
+CLEANUP_ARCHIVE = os.getenv("CLEANUP_ARCHIVE", "true").lower() in ["1", "true", "yes"]
+
+# Columns written by the collector, and the subset a re-collected event may update
+EVENT_UPSERT_FIELDS = ["event_name", "location", "date", "description", "booking_url", "source"]
+EVENT_UPSERT_UPDATE_FIELDS = ["description", "booking_url", "source"]
+
 
 async def fetch_page_content(url: str) -> str:
-    async with httpx.AsyncClient(timeout=30) as client: 
-        r = await client.get(url)
-        r.raise_for_status() 
-        return r.text # taking HTML TEXT content from the pages
+    """Fetch a page through the shared crawler and return its main text, not the raw HTML."""
+    page = await crawler.fetch(url)
+    return page["text"]
 
-async def search_google_for_events(query: str) -> List[dict]:
-    """Search Google for events using Gemini AI"""
+async def generate_events_json(prompt: str, use_cache: bool = True, schema: Optional[Dict] = None, expect: str = "array") -> Union[List[dict], Dict]:
+    """Send a prompt to Gemini, or serve it from the response cache, and parse the JSON it returns.
+
+    Complete items are salvaged from a malformed response; it only fails when nothing could be recovered.
+    """
+    use_cache = use_cache and not LLM_CACHE_DISABLED
+    if use_cache:
+        cached = response_cache.get(LLM_MODEL_NAME, prompt)
+        if cached is not None:
+            value, complete = parse_json_response(cached, expect)
+            # Entries written before responses were validated may have the wrong shape
+            if complete and matches_schema(value, schema):
+                return value
+
+    events, complete, response_text = await generate_json(prompt, LLM_AGENT_NAME, schema, expect)
+    if not complete and not events:
+        raise ValueError("Gemini returned no parseable JSON")
+    # Only cache responses that parsed fully into the expected shape, so a bad answer is retried on the next run
+    if use_cache and complete and matches_schema(events, schema):
+        response_cache.set(LLM_MODEL_NAME, prompt, response_text)
+    elif complete and schema:
+        logger.warning("[Gemini] Response does not match the expected schema; not caching it")
+    return events
+
+def parse_event_dates(events: List[dict], label: str) -> List[dict]:
+    """Convert yyyy-mm-dd date strings to datetime objects, dropping dates that do not parse."""
+    from datetime import datetime
+    for event in events:
+        if isinstance(event, dict) and event.get('date') and isinstance(event['date'], str):
+            try:
+                event['date'] = datetime.strptime(event['date'], '%Y-%m-%d')
+            except ValueError:
+                logger.warning(f"Invalid date format for {label} event: {event.get('event_name', 'Unknown')}")
+                event['date'] = None
+    return events
+
+async def search_events_for_query(query: str, use_cache: bool = True) -> List[dict]:
+    """Ask Gemini for upcoming events matching one query. The caller sets each event's source."""
     prompt = f"""
     You are an event discovery agent. Search for upcoming events in Sri Lanka based on this query: "{query}"
     
@@ -62,7 +137,6 @@ async def search_google_for_events(query: str) -> List[dict]:
     - date (string in yyyy-mm-dd format, must be future dates)
     - description (string)
     - booking_url (string, if available)
-    - source (string, set to "Google Search")
     
     Focus on:
     - Events happening in major Sri Lankan cities (Colombo, Kandy, Galle, Jaffna, Negombo, etc.)
@@ -72,45 +146,27 @@ async def search_google_for_events(query: str) -> List[dict]:
     
     Return maximum 5 events per query. Return valid JSON array only, no explanations.
     """
-    
-    try:
-        response = model.generate_content(prompt)
-        # Clean the response to extract JSON
-        response_text = response.text.strip()
-        if response_text.startswith("```json"):
-            response_text = response_text[7:]
-        if response_text.endswith("```"):
-            response_text = response_text[:-3]
-        
-        events = json.loads(response_text)
-        
-        # Convert date strings to datetime objects
-        for event in events:
-            if event.get('date') and isinstance(event['date'], str):
-                try:
-                    from datetime import datetime
-                    event['date'] = datetime.strptime(event['date'], '%Y-%m-%d')
-                except ValueError:
-                    logger.warning(f"Invalid date format for Google event: {event.get('event_name', 'Unknown')}")
-                    event['date'] = None
-        
-        return events
-    except Exception as e:
-        logger.warning(f"[Google Search] Failed to search for '{query}': {e}")
-        return []
 
-async def search_bing_for_events(query: str) -> List[dict]:
-    """Search Bing for events using Gemini AI"""
+    events = await generate_events_json(prompt, use_cache, EVENT_LIST_SCHEMA)
+    if not isinstance(events, list):
+        raise ValueError("expected a JSON array of events")
+    return parse_event_dates(events, "Gemini")
+
+async def search_events_batched(queries: List[str], use_cache: bool = True) -> Dict[str, List[dict]]:
+    """Search for several queries in one Gemini request and split the answer back per query."""
+    query_ids = {f"q{i + 1}": query for i, query in enumerate(queries)}
+    query_lines = "\n".join(f'    {query_id}: "{query}"' for query_id, query in query_ids.items())
     prompt = f"""
-    You are an event discovery agent. Search for upcoming events in Sri Lanka based on this query: "{query}"
+    You are an event discovery agent. Search for upcoming events in Sri Lanka for each of these queries:
+{query_lines}
     
-    Return a JSON array of events with the following structure for each event:
+    Return a JSON object whose keys are the query ids above ({", ".join(query_ids)}) and whose values are
+    JSON arrays of events found for that query, each with the following structure:
     - event_name (string)
     - location (string, must be in Sri Lanka)
     - date (string in yyyy-mm-dd format, must be future dates)
     - description (string)
     - booking_url (string, if available)
-    - source (string, set to "Bing Search")
     
     Focus on:
     - Events happening in major Sri Lankan cities (Colombo, Kandy, Galle, Jaffna, Negombo, etc.)
@@ -118,35 +174,126 @@ async def search_bing_for_events(query: str) -> List[dict]:
     - Various event types: music, tech, art, food, cultural, business, etc.
     - Include both free and paid events
     
-    Return maximum 5 events per query. Return valid JSON array only, no explanations.
+    Return maximum 5 events per query. Include every query id, with an empty array if nothing was found.
+    Return a valid JSON object only, no explanations.
     """
-    
+
+    response = await generate_events_json(prompt, use_cache, keyed_event_lists_schema(list(query_ids)), expect="object")
+    if not isinstance(response, dict):
+        raise ValueError("expected a JSON object keyed by query id")
+
+    results = {}
+    for query_id, query in query_ids.items():
+        events = response.get(query_id) or []
+        results[query] = parse_event_dates(events if isinstance(events, list) else [], "Gemini")
+    return results
+
+async def search_google_for_events(query: str, use_cache: bool = True) -> List[dict]:
+    """Search Google for events using Gemini AI"""
     try:
-        response = model.generate_content(prompt)
-        # Clean the response to extract JSON
-        response_text = response.text.strip()
-        if response_text.startswith("```json"):
-            response_text = response_text[7:]
-        if response_text.endswith("```"):
-            response_text = response_text[:-3]
-        
-        events = json.loads(response_text)
-        
-        # Convert date strings to datetime objects
-        for event in events:
-            if event.get('date') and isinstance(event['date'], str):
-                try:
-                    from datetime import datetime
-                    event['date'] = datetime.strptime(event['date'], '%Y-%m-%d')
-                except ValueError:
-                    logger.warning(f"Invalid date format for Bing event: {event.get('event_name', 'Unknown')}")
-                    event['date'] = None
-        
-        return events
+        events = await search_events_for_query(query, use_cache)
+        return [{**event, "source": "Google Search"} for event in events if isinstance(event, dict)]
+    except Exception as e:
+        logger.warning(f"[Google Search] Failed to search for '{query}': {e}")
+        return []
+
+async def search_bing_for_events(query: str, use_cache: bool = True) -> List[dict]:
+    """Search Bing for events using Gemini AI"""
+    try:
+        events = await search_events_for_query(query, use_cache)
+        return [{**event, "source": "Bing Search"} for event in events if isinstance(event, dict)]
     except Exception as e:
         logger.warning(f"[Bing Search] Failed to search for '{query}': {e}")
         return []
 
+
+class SearchProvider:
+    """A source of raw events for the collector.
+
+    Providers that share a ``coalesce_key`` send identical requests to the same
+    backend, so the collector makes one call per query batch and attributes the
+    results to every provider that asked for it.
+    """
+
+    def __init__(self, name: str, concurrency: int = COLLECTOR_CONCURRENCY):
+        self.name = name
+        self.concurrency = max(1, concurrency)
+
+    @property
+    def coalesce_key(self) -> str:
+        # Unique per provider unless a subclass knows its requests are shared
+        return f"{type(self).__name__}:{self.name}"
+
+    async def search(self, queries: List[str], use_cache: bool = True) -> Dict[str, List[dict]]:
+        """Return the raw events found for each query. Errors propagate to the caller."""
+        raise NotImplementedError
+
+
+class GeminiSearchProvider(SearchProvider):
+    """Asks Gemini for events; every instance sends the same prompts to the same model."""
+
+    @property
+    def coalesce_key(self) -> str:
+        return f"gemini:{LLM_MODEL_NAME}"
+
+    async def search(self, queries: List[str], use_cache: bool = True) -> Dict[str, List[dict]]:
+        if len(queries) == 1:
+            return {queries[0]: await search_events_for_query(queries[0], use_cache)}
+        return await search_events_batched(queries, use_cache)
+
+
+class FixtureSearchProvider(SearchProvider):
+    """Serves events from a local JSON file, for development and tests without Gemini.
+
+    The file holds either a list of events returned for every query, or an
+    object mapping each query to its list of events.
+    """
+
+    def __init__(self, name: str, path: str, concurrency: int = COLLECTOR_CONCURRENCY):
+        super().__init__(name, concurrency)
+        self.path = path
+
+    @property
+    def coalesce_key(self) -> str:
+        return f"fixture:{os.path.abspath(self.path)}"
+
+    async def search(self, queries: List[str], use_cache: bool = True) -> Dict[str, List[dict]]:
+        with open(self.path, "r", encoding="utf-8") as f:
+            fixture = json.load(f)
+        results = {}
+        for query in queries:
+            events = fixture.get(query, []) if isinstance(fixture, dict) else fixture
+            results[query] = parse_event_dates([dict(event) for event in events if isinstance(event, dict)], self.name)
+        return results
+
+
+# Registry of search providers, keyed by the source name they attribute events to
+SEARCH_PROVIDER_REGISTRY: Dict[str, SearchProvider] = {}
+
+def register_search_provider(provider: SearchProvider) -> SearchProvider:
+    SEARCH_PROVIDER_REGISTRY[provider.name] = provider
+    return provider
+
+def get_search_providers(names: Optional[List[str]] = None) -> List[SearchProvider]:
+    """Enabled providers in configured order, skipping unknown names."""
+    providers = []
+    for name in names or COLLECTOR_PROVIDERS:
+        if name in SEARCH_PROVIDER_REGISTRY:
+            providers.append(SEARCH_PROVIDER_REGISTRY[name])
+        else:
+            logger.warning(f"Unknown search provider '{name}' ignored")
+    return providers
+
+def search_provider_concurrency(name: str) -> int:
+    """Concurrency limit for one provider: SEARCH_PROVIDER_CONCURRENCY_<NAME>, else the shared default."""
+    env_name = "SEARCH_PROVIDER_CONCURRENCY_" + re.sub(r"[^A-Z0-9]+", "_", name.upper()).strip("_")
+    return int(os.getenv(env_name, str(SEARCH_PROVIDER_CONCURRENCY)))
+
+register_search_provider(GeminiSearchProvider("Google Search", search_provider_concurrency("Google Search")))
+register_search_provider(GeminiSearchProvider("Bing Search", search_provider_concurrency("Bing Search")))
+if COLLECTOR_FIXTURE_PATH:
+    register_search_provider(FixtureSearchProvider("Fixture", COLLECTOR_FIXTURE_PATH, search_provider_concurrency("Fixture")))
+
     
 def extract_events_from_text(raw_text: str, source: str) -> List[dict]: #send the content
     prompt = f"""
@@ -169,9 +316,8 @@ def extract_events_from_text(raw_text: str, source: str) -> List[dict]: #send th
     """
 
     try:
-        response = model.generate_content(prompt)
-        structured_json = response.text.strip("```")
-        events = json.loads(structured_json)
+        events, _, _ = generate_json_sync(prompt, LLM_AGENT_NAME, EVENT_LIST_SCHEMA)
+        events = [event for event in events if isinstance(event, dict)]
         
         # Convert date strings to datetime objects
         for event in events:
@@ -189,99 +335,553 @@ def extract_events_from_text(raw_text: str, source: str) -> List[dict]: #send th
         return [] 
 
     
-def insert_events_to_db(events: List[Event]) -> List[int]: 
+def compute_natural_key(event_name: str, location: str, date) -> str:
+    """Stable key identifying an event by its name, location and day."""
+    day = date.strftime("%Y-%m-%d") if hasattr(date, "strftime") else (str(date)[:10] if date else "")
+    raw = f"{(event_name or '').strip().lower()}|{(location or '').strip().lower()}|{day}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def _event_row(event: Union[Event, dict]) -> dict:
+    if isinstance(event, dict):
+        row = {field: event.get(field) for field in EVENT_UPSERT_FIELDS}
+    else:
+        row = {field: getattr(event, field) for field in EVENT_UPSERT_FIELDS}
+    # A near-duplicate of a stored event carries that event's natural key so the upsert updates it
+    natural_key = event.get("natural_key") if isinstance(event, dict) else event.natural_key
+    row["natural_key"] = natural_key or compute_natural_key(row["event_name"], row["location"], row["date"])
+    row["fingerprint"] = compute_fingerprint(row["event_name"], row["location"], row["date"])
+    return row
+
+def _upsert_chunk_mysql(db, rows: List[dict]) -> None:
+    """One multi-row INSERT ... ON DUPLICATE KEY UPDATE; MySQL only writes columns whose value changed."""
+    table = Event.__table__
+    stmt = mysql_insert(table).values(rows)
+    stmt = stmt.on_duplicate_key_update({
+        # Keep the stored value when the new payload has no value for the field
+        field: func.coalesce(stmt.inserted[field], table.c[field])
+        for field in EVENT_UPSERT_UPDATE_FIELDS
+    })
+    db.execute(stmt)
+
+def _upsert_chunk_generic(db, rows: List[dict]) -> None:
+    """Chunked executemany fallback: insert new keys, update only rows whose fields changed."""
+    table = Event.__table__
+    keys = [row["natural_key"] for row in rows]
+    existing = {
+        r.natural_key: r
+        for r in db.execute(
+            select(table.c.id, table.c.natural_key, *[table.c[f] for f in EVENT_UPSERT_UPDATE_FIELDS])
+            .where(table.c.natural_key.in_(keys))
+        )
+    }
+
+    new_rows = []
+    changed_rows = []
+    for row in rows:
+        current = existing.get(row["natural_key"])
+        if current is None:
+            new_rows.append(row)
+            continue
+        merged = {f: row[f] if row[f] is not None else getattr(current, f) for f in EVENT_UPSERT_UPDATE_FIELDS}
+        if any(merged[f] != getattr(current, f) for f in EVENT_UPSERT_UPDATE_FIELDS):
+            changed_rows.append({"_id": current.id, **{f"_{f}": merged[f] for f in EVENT_UPSERT_UPDATE_FIELDS}})
+
+    if new_rows:
+        db.execute(table.insert(), new_rows)
+    if changed_rows:
+        db.execute(
+            table.update()
+            .where(table.c.id == bindparam("_id"))
+            .values({f: bindparam(f"_{f}") for f in EVENT_UPSERT_UPDATE_FIELDS}),
+            changed_rows
+        )
+
+def upsert_events_to_db(events: List[Union[Event, dict]], chunk_size: int = EVENT_UPSERT_CHUNK_SIZE) -> List[int]:
+    """Bulk insert or update events by natural key, returning the ids of every affected event."""
+    # Last occurrence wins when a batch repeats the same event
+    rows_by_key = {}
+    for event in events:
+        row = _event_row(event)
+        rows_by_key[row["natural_key"]] = row
+    rows = list(rows_by_key.values())
+    if not rows:
+        return []
+
     db = SessionLocal()
-    inserted_ids = []
     try:
-        for event in events:
-            db.add(event)
-            db.flush()
-            inserted_ids.append(event.id)
+        use_mysql = db.get_bind().dialect.name == "mysql"
+        affected_ids = []
+        for start in range(0, len(rows), max(1, chunk_size)):
+            chunk = rows[start:start + chunk_size]
+            if use_mysql:
+                _upsert_chunk_mysql(db, chunk)
+            else:
+                _upsert_chunk_generic(db, chunk)
+            keys = [row["natural_key"] for row in chunk]
+            affected_ids.extend(event_id for (event_id,) in db.query(Event.id).filter(Event.natural_key.in_(keys)))
         db.commit()
-        return inserted_ids
+        logger.info(f"[DB] Upserted {len(affected_ids)} events in {-(-len(rows) // max(1, chunk_size))} chunks")
+        return affected_ids
     except Exception as e:
         db.rollback()
-        logger.error(f"[DB] Failed to insert events: {e}")
+        logger.error(f"[DB] Failed to upsert events: {e}")
         raise e
     finally:
         db.close()
 
+def insert_events_to_db(events: List[Event]) -> List[int]:
+    """Save collected events, updating any that are already stored (see upsert_events_to_db)."""
+    return upsert_events_to_db(events)
+
 def insert_single_event(event_data: dict) -> Event:
+    """Save one event, or update the stored event with the same natural key."""
+    validated_event = EventCreate(**event_data)
+    event_id = upsert_events_to_db([validated_event.dict()])[0]
     db = SessionLocal()
     try:
-        validated_event = EventCreate(**event_data)
-        event = Event(**validated_event.dict())
-        db.add(event)
-        db.commit()
-        db.refresh(event)
-        return event
+        return db.query(Event).filter(Event.id == event_id).first()
     finally:
         db.close()
 
-def cleanup_outdated_events():
-    """Remove events that are older than today"""
+def cleanup_outdated_events(batch_size: int = CLEANUP_BATCH_SIZE, pause_seconds: float = CLEANUP_PAUSE_SECONDS, archive: bool = CLEANUP_ARCHIVE) -> Dict:
+    """Remove events that are older than today in short primary-key range chunks.
+
+    Each chunk optionally copies its outdated rows into events_archive, deletes
+    them with one set-based statement and commits before moving on, so row locks
+    are held only briefly and memory stays constant however large the backlog is.
+    """
     from datetime import datetime, date
-    
+
+    events = Event.__table__
+    archive_table = EventArchive.__table__
+    columns = [c.name for c in events.columns]
+    today = date.today()
+    batch_size = max(1, batch_size)
+    stats = {"deleted": 0, "archived": 0, "chunks": 0}
+
     db = SessionLocal()
     try:
-        today = date.today()
-        outdated_events = db.query(Event).filter(Event.date < today).all()
-        
-        if outdated_events:
-            for event in outdated_events:
-                db.delete(event)
+        last_id = db.query(func.min(Event.id)).scalar()
+        max_id = db.query(func.max(Event.id)).scalar()
+        if last_id is None:
+            logger.info("No outdated events found")
+            return stats
+        last_id -= 1
+
+        while last_id < max_id:
+            # Upper bound of the next chunk, found by walking the primary key index
+            upper_id = db.query(Event.id).filter(Event.id > last_id).order_by(Event.id).offset(batch_size - 1).limit(1).scalar()
+            if upper_id is None:
+                upper_id = max_id
+            in_chunk = (events.c.id > last_id) & (events.c.id <= upper_id) & (events.c.date < today)
+
+            if archive:
+                copied = db.execute(
+                    archive_table.insert().from_select(
+                        columns + ["archived_at"],
+                        select(*[events.c[name] for name in columns], literal(datetime.utcnow())).where(in_chunk)
+                    )
+                )
+                stats["archived"] += copied.rowcount or 0
+            deleted = db.execute(events.delete().where(in_chunk))
             db.commit()
-            logger.info(f"Cleaned up {len(outdated_events)} outdated events")
+
+            stats["deleted"] += deleted.rowcount or 0
+            stats["chunks"] += 1
+            last_id = upper_id
+            if pause_seconds > 0:
+                time.sleep(pause_seconds)
+
+        if stats["deleted"]:
+            logger.info(f"Cleaned up {stats['deleted']} outdated events in {stats['chunks']} chunks ({stats['archived']} archived)")
         else:
             logger.info("No outdated events found")
-            
     except Exception as e:
         logger.error(f"Error cleaning up outdated events: {e}")
         db.rollback()
     finally:
         db.close()
+    return stats
 
 
-@router.post("/collect-event") #post request 
-async def collect_event():
-    all_events = []
+# A search job is one backend call: the providers that requested it and the queries it covers
+SearchJob = Tuple[List[SearchProvider], List[str]]
 
-    # Clean up outdated events first
-    logger.info("Cleaning up outdated events...")
-    cleanup_outdated_events()
+def build_search_jobs(queries: List[str], scheduled: bool = COLLECTOR_SCHEDULED, budget: int = SCHEDULER_RUN_BUDGET, batch_size: int = COLLECTOR_PROMPT_BATCH_SIZE, providers: Optional[List[SearchProvider]] = None) -> List[SearchJob]:
+    """List the search jobs for a run.
+
+    When scheduled, only due (provider, query) pairs are included. Pairs whose
+    providers share a coalesce key are merged into one request, and each job
+    covers up to `batch_size` queries.
+    """
+    batch_size = max(1, batch_size)
+    providers = providers or get_search_providers()
+    by_name = {provider.name: provider for provider in providers}
+    pairs = [(provider.name, query) for provider in providers for query in queries]
+    if scheduled:
+        pairs = select_due_queries(pairs, budget * batch_size if budget > 0 else budget)
+
+    # Which providers asked for each (backend, query)
+    requesters: Dict[Tuple[str, str], List[str]] = {}
+    for name, query in pairs:
+        requesters.setdefault((by_name[name].coalesce_key, query), []).append(name)
+
+    # Batch queries that are requested by the same set of providers
+    grouped: Dict[Tuple[str, Tuple[str, ...]], List[str]] = {}
+    for (coalesce_key, query), names in requesters.items():
+        grouped.setdefault((coalesce_key, tuple(names)), []).append(query)
 
-    # Collect events from Google search
-    logger.info("Starting Google search for Sri Lankan events...")
-    for query in SEARCH_QUERIES:
+    jobs = []
+    for (_, names), group_queries in grouped.items():
+        for start in range(0, len(group_queries), batch_size):
+            jobs.append(([by_name[name] for name in names], group_queries[start:start + batch_size]))
+    return jobs
+
+def provider_semaphores(jobs: List[SearchJob]) -> Dict[str, asyncio.Semaphore]:
+    """Per-run semaphores enforcing each provider's own concurrency limit."""
+    return {provider.name: asyncio.Semaphore(provider.concurrency) for providers, _ in jobs for provider in providers}
+
+async def run_search_job(job: SearchJob, semaphore: asyncio.Semaphore, limits: Dict[str, asyncio.Semaphore], timeout: float, use_cache: bool = True) -> List[Tuple[List[dict], Dict]]:
+    """Run one search call and record latency and yield for each requesting provider and query."""
+    requesters, queries = job
+    provider = requesters[0]
+    async with semaphore, limits[provider.name]:
+        started = time.perf_counter()
+        status = "ok"
         try:
-            events = await search_google_for_events(query)
+            # The executor thread keeps running after a timeout, but the collector no longer waits on it
+            results = await asyncio.wait_for(provider.search(queries, use_cache), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"[{provider.name}] Timed out after {timeout}s searching for {queries}")
+            results = {}
+            status = "timeout"
+        except Exception as e:
+            logger.warning(f"[{provider.name}] Error searching for {queries}: {e}")
+            results = {}
+            status = "error"
+        latency = time.perf_counter() - started
+
+    outcomes = []
+    for query in queries:
+        found = [event for event in results.get(query, []) if isinstance(event, dict)]
+        # Stats of every provider that requested this query; a new event is credited to all of them
+        query_group = []
+        for requester in requesters:
+            # Each requesting provider gets its own copy, attributed to its source
+            events = [{**event, "source": requester.name} for event in found]
+            logger.info(f"Found {len(events)} events for {requester.name} query: {query} ({latency:.2f}s)")
+            stats = {
+                "provider": requester.name,
+                "query": query,
+                "status": status,
+                "events": len(events),
+                "new_events": 0,
+                "batch_size": len(queries),
+                "coalesced": len(requesters),
+                "latency_seconds": round(latency, 3)
+            }
+            query_group.append(stats)
+            # Tag each event with its query so dedup can credit the query that found something new
+            for event in events:
+                event["_query_stats"] = query_group
+            outcomes.append((events, stats))
+    return outcomes
+
+async def collect_raw_events_concurrently(jobs: List[SearchJob], concurrency: int = COLLECTOR_CONCURRENCY, timeout: float = COLLECTOR_QUERY_TIMEOUT, use_cache: bool = True) -> Tuple[List[dict], List[Dict]]:
+    """Fan all search jobs out concurrently, bounded by a semaphore and a per-call timeout."""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    limits = provider_semaphores(jobs)
+    results = await asyncio.gather(*[
+        run_search_job(job, semaphore, limits, timeout, use_cache)
+        for job in jobs
+    ])
+
+    all_events = []
+    query_stats = []
+    for outcomes in results:
+        for events, stats in outcomes:
+            all_events.extend(events)
+            query_stats.append(stats)
+    return all_events, query_stats
+
+async def collect_raw_events_sequentially(jobs: List[SearchJob], timeout: float = COLLECTOR_QUERY_TIMEOUT, use_cache: bool = True) -> Tuple[List[dict], List[Dict]]:
+    """Run every search job one after another."""
+    semaphore = asyncio.Semaphore(1)
+    limits = provider_semaphores(jobs)
+    all_events = []
+    query_stats = []
+    current_providers = None
+    for job in jobs:
+        names = ", ".join(provider.name for provider in job[0])
+        if names != current_providers:
+            logger.info(f"Starting {names} for Sri Lankan events...")
+            current_providers = names
+        for events, stats in await run_search_job(job, semaphore, limits, timeout, use_cache):
             all_events.extend(events)
-            logger.info(f"Found {len(events)} events for Google query: {query}")
+            query_stats.append(stats)
+    return all_events, query_stats
+
+
+def credit_new_event(query_stats: Optional[List[Dict]]) -> None:
+    """Count a new event for every provider whose (possibly coalesced) query found it.
+
+    Later copies of the event from the other requesters are dropped as
+    duplicates, so without this only the first provider would be credited and
+    the scheduler would back the others off.
+    """
+    for stats in query_stats or []:
+        stats["new_events"] += 1
+
+def event_dedup_key(event: dict) -> str:
+    """Exact-match key used to skip duplicate events within a collection run."""
+    return f"{(event.get('event_name') or '').lower()}_{(event.get('location') or '').lower()}_{event.get('date', '')}"
+
+def check_near_duplicate(dedup_index: NearDuplicateIndex, event: dict) -> Tuple[bool, Optional[str]]:
+    """Check a validated event against stored and already-accepted events.
+
+    Returns (skip, natural_key). Near-duplicates of an event accepted earlier in
+    this run are skipped; near-duplicates of a stored event reuse its natural key
+    so the upsert refreshes that row instead of adding a new one.
+    """
+    match = dedup_index.find_duplicate(event.get("event_name"), event.get("location"), event.get("date"))
+    if match is None:
+        dedup_index.add(event.get("event_name"), event.get("location"), event.get("date"))
+        return False, None
+    if match["event_id"] is not None and match["natural_key"]:
+        logger.info(f"Matched '{event.get('event_name')}' to stored event {match['event_id']} ({match['similarity']:.2f})")
+        return False, match["natural_key"]
+    logger.info(f"Skipping near-duplicate event: {event.get('event_name', 'Unknown')} ~ {match['event_name']}")
+    return True, None
+
+def llm_cache_delta(before: Dict[str, int], use_cache: bool) -> Dict:
+    after = response_cache.stats()
+    return {
+        "enabled": use_cache and not LLM_CACHE_DISABLED,
+        "hits": after["hits"] - before["hits"],
+        "misses": after["misses"] - before["misses"]
+    }
+
+async def trigger_nlp_processing():
+    """Run the NLP agent over newly collected events without failing the collection."""
+    logger.info("Triggering NLP processing for newly collected events...")
+    try:
+        from agents.nlp_agent import batch_process_events
+        nlp_result = await run_agent_once("nlp_processing", batch_process_events)
+        logger.info(f"NLP processing completed: {nlp_result}")
+    except Exception as nlp_error:
+        logger.warning(f"NLP processing failed: {nlp_error}")
+
+
+# Streaming pipeline: search -> parse -> validate/dedup -> batched insert
+_STAGE_DONE = object()
+
+async def buffered_stage(source: AsyncIterator, maxsize: int = COLLECTOR_QUEUE_SIZE) -> AsyncIterator:
+    """Run a pipeline stage in its own task, handing items downstream through a bounded queue."""
+    queue = asyncio.Queue(maxsize=max(1, maxsize))
+    errors = []
+
+    async def pump():
+        try:
+            async for item in source:
+                await queue.put(item)
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            logger.warning(f"[Google Search] Error searching for '{query}': {e}")
-            continue
+            errors.append(e)
+        await queue.put(_STAGE_DONE)
+
+    task = asyncio.create_task(pump())
+    try:
+        while True:
+            item = await queue.get()
+            if item is _STAGE_DONE:
+                break
+            yield item
+        if errors:
+            raise errors[0]
+    finally:
+        task.cancel()
+
+async def search_stage(jobs: List[SearchJob], concurrency: int, timeout: float, use_cache: bool) -> AsyncIterator[Tuple[List[dict], Dict]]:
+    """Yield each query's result as soon as its search call returns, with at most `concurrency` calls in flight."""
+    concurrency = max(1, concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = provider_semaphores(jobs)
+    remaining = iter(jobs)
+    pending = set()
+
+    def schedule_next() -> None:
+        for job in remaining:
+            pending.add(asyncio.create_task(run_search_job(job, semaphore, limits, timeout, use_cache)))
+            return
+
+    try:
+        for _ in range(concurrency):
+            schedule_next()
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                pending.discard(task)
+                schedule_next()
+                for outcome in task.result():
+                    yield outcome
+    finally:
+        for task in pending:
+            task.cancel()
+
+async def parse_stage(results: AsyncIterator[Tuple[List[dict], Dict]], run_stats: Dict) -> AsyncIterator[dict]:
+    """Flatten per-query results into raw event dicts, recording query stats and source counts."""
+    async for events, stats in results:
+        run_stats["query_stats"].append(stats)
+        for event in events:
+            if not isinstance(event, dict):
+                continue
+            run_stats["total_collected"] += 1
+            source = event.get("source")
+            run_stats["sources"][source] = run_stats["sources"].get(source, 0) + 1
+            yield event
 
-    # Collect events from Bing search
-    logger.info("Starting Bing search for Sri Lankan events...")
-    for query in SEARCH_QUERIES:
+async def validate_stage(events: AsyncIterator[dict], dedup_index: NearDuplicateIndex, run_stats: Dict) -> AsyncIterator[Event]:
+    """Validate and deduplicate raw events, yielding ORM objects ready to insert."""
+    seen_events = set()
+    async for event in events:
+        event_query_stats = event.pop("_query_stats", None)
         try:
-            events = await search_bing_for_events(query)
-            all_events.extend(events)
-            logger.info(f"Found {len(events)} events for Bing query: {query}")
+            event_key = event_dedup_key(event)
+            if event_key in seen_events:
+                logger.info(f"Skipping duplicate event: {event.get('event_name', 'Unknown')}")
+                continue
+            seen_events.add(event_key)
+
+            validated_event = EventCreate(**event)
+            skip, natural_key = check_near_duplicate(dedup_index, validated_event.dict())
+            if skip:
+                run_stats["near_duplicates_skipped"] += 1
+                continue
+            if natural_key:
+                run_stats["matched_existing"] += 1
+            else:
+                credit_new_event(event_query_stats)
+            run_stats["validated"] += 1
+            yield Event(**validated_event.dict(), natural_key=natural_key)
+        except ValidationError as e:
+            logger.warning(f"[Validation] Skipped invalid event from {event.get('source', 'unknown')}: {e}")
+
+async def insert_stage(events: AsyncIterator[Event], batch_size: int, run_stats: Dict) -> AsyncIterator[List[int]]:
+    """Insert events in small batches as they arrive, yielding the ids of each committed batch."""
+    loop = asyncio.get_event_loop()
+
+    async def flush(batch: List[Event]) -> List[int]:
+        try:
+            ids = await loop.run_in_executor(None, insert_events_to_db, batch)
+            run_stats["insert_batches"] += 1
+            return ids
         except Exception as e:
-            logger.warning(f"[Bing Search] Error searching for '{query}': {e}")
-            continue
+            # insert_events_to_db already rolled back; keep going so earlier batches stay persisted
+            run_stats["failed_batches"] += 1
+            logger.error(f"[DB] Failed to insert batch of {len(batch)} events: {e}")
+            return []
+
+    batch = []
+    async for event in events:
+        batch.append(event)
+        if len(batch) >= batch_size:
+            yield await flush(batch)
+            batch = []
+    if batch:
+        yield await flush(batch)
+
+async def collect_events_streaming(jobs: List[SearchJob], concurrency: int = COLLECTOR_CONCURRENCY, timeout: float = COLLECTOR_QUERY_TIMEOUT, use_cache: bool = True, batch_size: int = COLLECTOR_INSERT_BATCH_SIZE) -> Dict:
+    """Stream search results through validation into the DB, committing each batch as soon as it fills."""
+    run_stats = {
+        "query_stats": [],
+        "sources": {},
+        "total_collected": 0,
+        "validated": 0,
+        "near_duplicates_skipped": 0,
+        "matched_existing": 0,
+        "insert_batches": 0,
+        "failed_batches": 0
+    }
+    inserted_ids = []
+
+    results = buffered_stage(search_stage(jobs, concurrency, timeout, use_cache))
+    raw_events = parse_stage(results, run_stats)
+    dedup_index = await asyncio.get_event_loop().run_in_executor(None, NearDuplicateIndex.from_db)
+    validated = buffered_stage(validate_stage(raw_events, dedup_index, run_stats))
+    async for ids in insert_stage(validated, max(1, batch_size), run_stats):
+        inserted_ids.extend(ids)
+
+    logger.info(f"Streaming collection stored {len(inserted_ids)} events in {run_stats['insert_batches']} batches ({run_stats['failed_batches']} failed)")
+    return {"inserted_ids": inserted_ids, **run_stats}
+
+
+@router.post("/collect-event") #post request 
+async def collect_event(mode: str = COLLECTOR_MODE, concurrency: int = COLLECTOR_CONCURRENCY, timeout: float = COLLECTOR_QUERY_TIMEOUT, use_cache: bool = True, scheduled: bool = COLLECTOR_SCHEDULED, run_nlp: bool = True, prompt_batch_size: int = COLLECTOR_PROMPT_BATCH_SIZE):
+    loop = asyncio.get_event_loop()
+
+    # Clean up outdated events first
+    logger.info("Cleaning up outdated events...")
+    cleanup_stats = await loop.run_in_executor(None, cleanup_outdated_events)
+
+    jobs = await loop.run_in_executor(None, build_search_jobs, SEARCH_QUERIES, scheduled, SCHEDULER_RUN_BUDGET, prompt_batch_size)
+    cache_before = response_cache.stats()
+    started = time.perf_counter()
+
+    if mode == "streaming":
+        logger.info(f"Streaming {len(jobs)} search calls (concurrency={concurrency})...")
+        stream_result = await collect_events_streaming(jobs, concurrency, timeout, use_cache)
+        collection_seconds = time.perf_counter() - started
+        cache_stats = llm_cache_delta(cache_before, use_cache)
+        await loop.run_in_executor(None, record_query_results, stream_result["query_stats"])
+
+        if run_nlp:
+            await trigger_nlp_processing()
+
+        return {
+            "status": "success" if not stream_result["failed_batches"] else "partial",
+            "events_collected": len(stream_result["inserted_ids"]),
+            "inserted_ids": stream_result["inserted_ids"],
+            "sources": {
+                "google_search": stream_result["sources"].get("Google Search", 0),
+                "bing_search": stream_result["sources"].get("Bing Search", 0)
+            },
+            "nlp_processing": "triggered" if run_nlp else "skipped",
+            "collection_mode": "streaming",
+            "scheduled": scheduled,
+            "cleanup": cleanup_stats,
+            "collection_seconds": round(collection_seconds, 3),
+            "near_duplicates_skipped": stream_result["near_duplicates_skipped"],
+            "matched_existing": stream_result["matched_existing"],
+            "insert_batches": stream_result["insert_batches"],
+            "failed_batches": stream_result["failed_batches"],
+            "query_stats": stream_result["query_stats"],
+            "llm_cache": cache_stats
+        }
+
+    if mode == "sequential":
+        all_events, query_stats = await collect_raw_events_sequentially(jobs, timeout, use_cache)
+    else:
+        logger.info(f"Running {len(jobs)} search calls (concurrency={concurrency})...")
+        all_events, query_stats = await collect_raw_events_concurrently(jobs, concurrency, timeout, use_cache)
+    collection_seconds = time.perf_counter() - started
+    cache_stats = llm_cache_delta(cache_before, use_cache)
+    logger.info(f"LLM response cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
 
     logger.info(f"Total events collected: {len(all_events)}")
 
     # Validate and deduplicate events
     validated = []
     seen_events = set()  # To avoid duplicates
+    dedup_index = await loop.run_in_executor(None, NearDuplicateIndex.from_db)
+    near_duplicates_skipped = 0
+    matched_existing = 0
     
     for event in all_events:
+        event_query_stats = event.pop("_query_stats", None)
         try:
             # Create a unique key for deduplication
-            event_key = f"{event.get('event_name', '').lower()}_{event.get('location', '').lower()}_{event.get('date', '')}"
+            event_key = event_dedup_key(event)
             
             if event_key in seen_events:
                 logger.info(f"Skipping duplicate event: {event.get('event_name', 'Unknown')}")
@@ -290,24 +890,27 @@ async def collect_event():
             seen_events.add(event_key)
             
             validated_event = EventCreate(**event) #validating 
-            validated.append(Event(**validated_event.dict())) #valid events 
+            skip, natural_key = check_near_duplicate(dedup_index, validated_event.dict())
+            if skip:
+                near_duplicates_skipped += 1
+                continue
+            if natural_key:
+                matched_existing += 1
+            else:
+                credit_new_event(event_query_stats)
+            validated.append(Event(**validated_event.dict(), natural_key=natural_key)) #valid events 
         except ValidationError as e:
             logger.warning(f"[Validation] Skipped invalid event from {event.get('source', 'unknown')}: {e}")
 
     logger.info(f"Valid events after deduplication: {len(validated)}")
+    await loop.run_in_executor(None, record_query_results, query_stats)
 
     try:
         inserted_ids = insert_events_to_db(validated) #adding after validation 
         
         # Trigger NLP processing for newly added events
-        logger.info("Triggering NLP processing for newly collected events...")
-        try:
-            from agents.nlp_agent import batch_process_events
-            nlp_result = await batch_process_events()
-            logger.info(f"NLP processing completed: {nlp_result}")
-        except Exception as nlp_error:
-            logger.warning(f"NLP processing failed: {nlp_error}")
-            # Don't fail the entire collection if NLP processing fails
+        if run_nlp:
+            await trigger_nlp_processing()
         
         return {
             "status": "success",
@@ -317,7 +920,15 @@ async def collect_event():
                 "google_search": len([e for e in all_events if e.get('source') == 'Google Search']),
                 "bing_search": len([e for e in all_events if e.get('source') == 'Bing Search'])
             },
-            "nlp_processing": "triggered"
+            "near_duplicates_skipped": near_duplicates_skipped,
+            "matched_existing": matched_existing,
+            "nlp_processing": "triggered" if run_nlp else "skipped",
+            "collection_mode": "sequential" if mode == "sequential" else "concurrent",
+            "scheduled": scheduled,
+            "cleanup": cleanup_stats,
+            "collection_seconds": round(collection_seconds, 3),
+            "query_stats": query_stats,
+            "llm_cache": cache_stats
         }
     except Exception as e:
         logger.error(f"[DB] Failed to insert events: {e}")
@@ -0,0 +1,183 @@
+import os
+import re
+import random
+import hashlib
+import logging
+from datetime import date as date_type
+from typing import Dict, List, Optional, Tuple
+from db.database import SessionLocal
+from db.models import Event
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# MinHash / LSH settings over the event name. 16 bands of 4 rows puts the candidate threshold near 0.5 Jaccard
+DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", "64"))
+DEDUP_BANDS = int(os.getenv("DEDUP_BANDS", "16"))
+DEDUP_SIMILARITY_THRESHOLD = float(os.getenv("DEDUP_SIMILARITY_THRESHOLD", "0.7"))
+# Share of venue words two events must have in common; a missing venue matches any venue
+DEDUP_VENUE_THRESHOLD = float(os.getenv("DEDUP_VENUE_THRESHOLD", "0.5"))
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(1337)  # fixed seed so signatures are stable across processes
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME)) for _ in range(DEDUP_NUM_PERM)]
+
+# Words that vary between search results for the same event without changing its identity
+_NOISE_WORDS = {
+    "the", "a", "an", "and", "of", "in", "at", "on", "for", "with", "by",
+    "sri", "lanka", "event", "events", "live", "presents", "official", "annual"
+}
+
+
+def normalize_text(text: str) -> str:
+    text = (text or "").lower()
+    text = re.sub(r"[^a-z0-9\s]", " ", text)
+    words = [w for w in text.split() if w not in _NOISE_WORDS and not re.fullmatch(r"(19|20)\d\d", w)]
+    return " ".join(words)
+
+def normalize_venue(location: str) -> str:
+    # The location agent stores "name|lat,lon"; only the name identifies the venue
+    return normalize_text((location or "").split("|")[0])
+
+def normalize_day(value) -> str:
+    if value is None or value == "":
+        return ""
+    if isinstance(value, date_type):
+        return value.strftime("%Y-%m-%d")
+    return str(value)[:10]
+
+def compute_fingerprint(event_name: str, location: str, date) -> str:
+    """Hash of the normalized name, venue and day, persisted on Event.fingerprint."""
+    raw = f"{normalize_text(event_name)}|{normalize_venue(location)}|{normalize_day(date)}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+def _shingles(text: str, size: int = 3) -> set:
+    text = text.replace(" ", "_")
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+def minhash_signature(event_name: str) -> Tuple[int, ...]:
+    # Name only: a long shared venue would otherwise make different events at it look alike
+    shingles = _shingles(normalize_text(event_name))
+    if not shingles:
+        return tuple([_MERSENNE_PRIME] * DEDUP_NUM_PERM)
+    hashed = [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big") for s in shingles]
+    return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashed) for a, b in _PERMUTATIONS)
+
+def estimate_similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+def venues_match(venue_a: str, venue_b: str, threshold: float = DEDUP_VENUE_THRESHOLD) -> bool:
+    """Whether two normalized venues can be the same place; sources often add or drop the city."""
+    words_a, words_b = set(venue_a.split()), set(venue_b.split())
+    if not words_a or not words_b:
+        return True
+    return len(words_a & words_b) / min(len(words_a), len(words_b)) >= threshold
+
+
+class NearDuplicateIndex:
+    """MinHash/LSH index over normalized event names, bucketed by event day.
+
+    Lookups first check for an exact fingerprint match, then only compare against
+    events that share at least one LSH band on the same day, so checking a new
+    event does not scan every stored event. A candidate must also be at a
+    matching venue.
+    """
+
+    def __init__(self, bands: int = DEDUP_BANDS, threshold: float = DEDUP_SIMILARITY_THRESHOLD):
+        self.bands = bands
+        self.rows = max(1, DEDUP_NUM_PERM // bands)
+        self.threshold = threshold
+        self.buckets: Dict[tuple, List[int]] = {}
+        self.entries: List[Dict] = []
+        self.fingerprints: Dict[str, int] = {}
+
+    def _band_keys(self, day: str, signature: Tuple[int, ...]) -> List[tuple]:
+        return [
+            (day, band, signature[band * self.rows:(band + 1) * self.rows])
+            for band in range(self.bands)
+        ]
+
+    def add(self, event_name: str, location: str, date, event_id: Optional[int] = None,
+            natural_key: Optional[str] = None, fingerprint: Optional[str] = None) -> None:
+        day = normalize_day(date)
+        signature = minhash_signature(event_name)
+        position = len(self.entries)
+        self.entries.append({
+            "event_id": event_id,
+            "natural_key": natural_key,
+            "event_name": event_name,
+            "venue": normalize_venue(location),
+            "signature": signature
+        })
+        self.fingerprints.setdefault(fingerprint or compute_fingerprint(event_name, location, date), position)
+        for key in self._band_keys(day, signature):
+            self.buckets.setdefault(key, []).append(position)
+
+    def find_duplicate(self, event_name: str, location: str, date) -> Optional[Dict]:
+        """Return the most similar indexed event above the threshold, or None."""
+        exact = self.fingerprints.get(compute_fingerprint(event_name, location, date))
+        if exact is not None:
+            return {**self.entries[exact], "similarity": 1.0}
+        day = normalize_day(date)
+        venue = normalize_venue(location)
+        signature = minhash_signature(event_name)
+        candidates = set()
+        for key in self._band_keys(day, signature):
+            candidates.update(self.buckets.get(key, []))
+
+        best, best_score = None, self.threshold
+        for position in candidates:
+            entry = self.entries[position]
+            if not venues_match(venue, entry["venue"]):
+                continue
+            score = estimate_similarity(signature, entry["signature"])
+            if score >= best_score:
+                best, best_score = entry, score
+        if best:
+            return {**best, "similarity": best_score}
+        return None
+
+    @classmethod
+    def from_db(cls) -> "NearDuplicateIndex":
+        """Build an index over stored upcoming and undated events, fingerprinting older rows first."""
+        backfill_fingerprints()
+        index = cls()
+        db = SessionLocal()
+        try:
+            rows = db.query(Event.id, Event.event_name, Event.location, Event.date, Event.natural_key, Event.fingerprint).filter(
+                (Event.date.is_(None)) | (Event.date >= date_type.today())
+            ).yield_per(1000)
+            for event_id, event_name, location, date, natural_key, fingerprint in rows:
+                index.add(event_name, location, date, event_id, natural_key, fingerprint)
+            logger.info(f"[Dedup] Indexed {len(index.entries)} stored events")
+        except Exception as e:
+            logger.error(f"[Dedup] Failed to load stored events: {e}")
+        finally:
+            db.close()
+        return index
+
+
+def backfill_fingerprints(batch_size: int = 500) -> int:
+    """Set Event.fingerprint on rows stored before fingerprinting existed."""
+    db = SessionLocal()
+    updated = 0
+    try:
+        while True:
+            events = db.query(Event).filter(Event.fingerprint.is_(None)).limit(batch_size).all()
+            if not events:
+                break
+            for event in events:
+                event.fingerprint = compute_fingerprint(event.event_name, event.location, event.date)
+            db.commit()
+            updated += len(events)
+        if updated:
+            logger.info(f"[Dedup] Backfilled fingerprints for {updated} events")
+        return updated
+    except Exception as e:
+        logger.error(f"[Dedup] Failed to backfill fingerprints: {e}")
+        db.rollback()
+        return updated
+    finally:
+        db.close()
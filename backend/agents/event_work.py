@@ -0,0 +1,150 @@
+import os
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+from sqlalchemy import bindparam, func
+from db.database import SessionLocal
+from db.models import Event
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Processing-status work queue shared by the NLP and location agents
+AGENT_WORK_CHUNK_SIZE = int(os.getenv("AGENT_WORK_CHUNK_SIZE", "200"))  # events fetched per keyset page
+AGENT_MAX_ATTEMPTS = int(os.getenv("AGENT_MAX_ATTEMPTS", "5"))  # failures before an event is given up on
+AGENT_RETRY_BASE_SECONDS = float(os.getenv("AGENT_RETRY_BASE_SECONDS", "300"))
+AGENT_RETRY_MAX_SECONDS = float(os.getenv("AGENT_RETRY_MAX_SECONDS", "86400"))
+
+STATUS_PENDING = "pending"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+# agent -> (status, attempts, retry_after) columns on Event
+STATUS_COLUMNS = {
+    "nlp": ("nlp_status", "nlp_attempts", "nlp_retry_after"),
+    "location": ("location_status", "location_attempts", "location_retry_after"),
+}
+
+
+def _columns(agent: str):
+    if agent not in STATUS_COLUMNS:
+        raise ValueError(f"Unknown agent '{agent}'; choose one of {', '.join(STATUS_COLUMNS)}")
+    return [getattr(Event, name) for name in STATUS_COLUMNS[agent]]
+
+def next_retry_after(attempts: int, now: Optional[datetime] = None) -> Optional[datetime]:
+    """When a row that has failed ``attempts`` times may be retried; None once it has used up its attempts."""
+    if attempts >= AGENT_MAX_ATTEMPTS:
+        return None
+    delay = min(AGENT_RETRY_MAX_SECONDS, AGENT_RETRY_BASE_SECONDS * 2 ** max(0, attempts - 1))
+    return (now or datetime.utcnow()) + timedelta(seconds=delay)
+
+def iter_keyset(predicate, chunk_size: int = AGENT_WORK_CHUNK_SIZE, limit: Optional[int] = None) -> Iterator[List[Event]]:
+    """Yield events matching ``predicate`` in primary-key order, one page per short-lived session.
+
+    Each page starts after the last id of the previous one, so rows updated
+    while the caller works on a page are neither skipped nor fetched twice.
+    """
+    chunk_size = max(1, chunk_size)
+    last_id = 0
+    fetched = 0
+    while limit is None or fetched < limit:
+        size = chunk_size if limit is None else min(chunk_size, limit - fetched)
+        db = SessionLocal()
+        try:
+            events = db.query(Event).filter(predicate, Event.id > last_id).order_by(Event.id).limit(size).all()
+        finally:
+            db.close()
+        if not events:
+            return
+        yield events
+        last_id = events[-1].id
+        fetched += len(events)
+        if len(events) < size:
+            return
+
+def _work_predicates(agent: str, now: datetime) -> List:
+    status, _, retry_after = _columns(agent)
+    return [
+        # NULL counts as pending, in case the column was added without its default
+        (status == STATUS_PENDING) | (status.is_(None)),
+        (status == STATUS_FAILED) & (retry_after.isnot(None)) & (retry_after <= now)
+    ]
+
+def iter_event_chunks(agent: str, chunk_size: int = AGENT_WORK_CHUNK_SIZE, limit: Optional[int] = None) -> Iterator[List[Event]]:
+    """Yield pages of events the agent still has to process: pending rows, then failed rows due for a retry."""
+    now = datetime.utcnow()
+    remaining = limit
+    for predicate in _work_predicates(agent, now):
+        for events in iter_keyset(predicate, chunk_size, remaining):
+            yield events
+            if remaining is not None:
+                remaining -= len(events)
+        if remaining is not None and remaining <= 0:
+            return
+
+def count_pending_events(agent: str) -> int:
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        return sum(db.query(func.count(Event.id)).filter(predicate).scalar() or 0 for predicate in _work_predicates(agent, now))
+    finally:
+        db.close()
+
+def mark_events_done(agent: str, event_ids: List[int], chunk_size: int = AGENT_WORK_CHUNK_SIZE) -> int:
+    """Set the agent's status to done for many events, one UPDATE and commit per chunk."""
+    status, _, retry_after = _columns(agent)
+    table = Event.__table__
+    updated = 0
+    db = SessionLocal()
+    try:
+        for start in range(0, len(event_ids), max(1, chunk_size)):
+            ids = event_ids[start:start + max(1, chunk_size)]
+            db.execute(table.update().where(table.c.id.in_(ids)).values({status.name: STATUS_DONE, retry_after.name: None}))
+            db.commit()
+            updated += len(ids)
+        return updated
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error marking {agent} work done: {e}")
+        return updated
+    finally:
+        db.close()
+
+def mark_events_failed(agent: str, events: List[Event]) -> int:
+    """Record a failed attempt for each event and schedule its retry with exponential backoff."""
+    if not events:
+        return 0
+    status, attempts, retry_after = _columns(agent)
+    table = Event.__table__
+    now = datetime.utcnow()
+    rows = []
+    for event in events:
+        count = (getattr(event, attempts.name) or 0) + 1
+        rows.append({"_id": event.id, "_attempts": count, "_retry_after": next_retry_after(count, now)})
+    db = SessionLocal()
+    try:
+        db.execute(
+            table.update()
+            .where(table.c.id == bindparam("_id"))
+            .values({status.name: STATUS_FAILED, attempts.name: bindparam("_attempts"), retry_after.name: bindparam("_retry_after")}),
+            rows
+        )
+        db.commit()
+        given_up = sum(1 for row in rows if row["_retry_after"] is None)
+        if given_up:
+            logger.warning(f"Giving up {agent} processing of {given_up} events after {AGENT_MAX_ATTEMPTS} attempts")
+        return len(rows)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error marking {agent} work failed: {e}")
+        return 0
+    finally:
+        db.close()
+
+def get_status_counts(agent: str) -> Dict[str, int]:
+    status = _columns(agent)[0]
+    db = SessionLocal()
+    try:
+        return {value or "unknown": count for value, count in db.query(status, func.count(Event.id)).group_by(status)}
+    finally:
+        db.close()
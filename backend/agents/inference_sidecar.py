@@ -0,0 +1,205 @@
+"""Shared NLP inference sidecar.
+
+Loads the spaCy and zero-shot models once and serves entity extraction and
+event-type classification to every web/worker process, answering concurrent
+requests in shared micro-batches:
+
+    python -m agents.inference_sidecar                          # listens on INFERENCE_SOCKET
+    python -m agents.inference_sidecar --host 127.0.0.1 --port 8765
+
+Clients use it when NLP_INFERENCE_URL is set (unix:///path/to.sock or http://host:port).
+"""
+import os
+import asyncio
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+import httpx
+from fastapi import FastAPI
+from pydantic import BaseModel
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Sidecar settings
+INFERENCE_SOCKET = os.getenv("INFERENCE_SOCKET", "/tmp/eventculture-nlp.sock")
+INFERENCE_MAX_BATCH = int(os.getenv("INFERENCE_MAX_BATCH", "32"))  # items per model call
+INFERENCE_BATCH_WAIT_MS = float(os.getenv("INFERENCE_BATCH_WAIT_MS", "5"))  # how long to collect requests
+INFERENCE_CLIENT_TIMEOUT_SECONDS = float(os.getenv("INFERENCE_CLIENT_TIMEOUT_SECONDS", "30"))
+NLP_INFERENCE_URL = os.getenv("NLP_INFERENCE_URL", "")
+
+
+class MicroBatcher:
+    """Collect items from concurrent requests for a few milliseconds and run them as one batch.
+
+    ``fn`` takes a list of items and returns a list of results in the same
+    order. It runs on a single dedicated thread, so models are never called
+    concurrently and the event loop stays free to accept more requests.
+    """
+
+    def __init__(self, name: str, fn: Callable[[List], List], max_batch: int = INFERENCE_MAX_BATCH, wait_ms: float = INFERENCE_BATCH_WAIT_MS):
+        self.name = name
+        self.fn = fn
+        self.max_batch = max(1, max_batch)
+        self.wait_seconds = max(0.0, wait_ms) / 1000
+        self.queue: Optional[asyncio.Queue] = None
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"batch-{name}")
+        self.batches = 0
+        self.items = 0
+
+    def start(self) -> None:
+        self.queue = asyncio.Queue()
+        asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, items: List) -> List:
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in items]
+        for item, future in zip(items, futures):
+            self.queue.put_nowait((item, future))
+        return list(await asyncio.gather(*futures))
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.wait_seconds
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            items = [item for item, _ in batch]
+            try:
+                results = await loop.run_in_executor(self.executor, self.fn, items)
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+            except Exception as e:
+                logger.error(f"[Sidecar] {self.name} batch of {len(items)} failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            self.batches += 1
+            self.items += len(items)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0
+        }
+
+
+class TextsRequest(BaseModel):
+    texts: List[str]
+
+
+def _classify_batch(texts: List[str]) -> List[str]:
+    from agents.nlp_agent import classify_event_types, get_classifier
+    # Passing the classifier explicitly keeps the sidecar from calling itself
+    return classify_event_types(texts, classifier=get_classifier())
+
+def _entities_batch(texts: List[str]) -> List[List[dict]]:
+    from agents.nlp_agent import extract_entities_batch_local
+    return extract_entities_batch_local(texts)
+
+def create_app(warm_up: bool = True) -> FastAPI:
+    app = FastAPI(title="EventCulture NLP inference sidecar")
+    classify_batcher = MicroBatcher("classify", _classify_batch)
+    entities_batcher = MicroBatcher("entities", _entities_batch)
+
+    @app.on_event("startup")
+    async def startup():
+        classify_batcher.start()
+        entities_batcher.start()
+        if warm_up:
+            from agents.nlp_agent import warm_up_models
+            await asyncio.get_running_loop().run_in_executor(None, warm_up_models)
+
+    @app.post("/classify")
+    async def classify(request: TextsRequest):
+        return {"event_types": await classify_batcher.submit(request.texts)}
+
+    @app.post("/entities")
+    async def entities(request: TextsRequest):
+        return {"entities": await entities_batcher.submit(request.texts)}
+
+    @app.get("/health")
+    def health():
+        from agents.nlp_agent import get_model_status
+        return {
+            "status": "success",
+            **get_model_status(),
+            "batching": {"classify": classify_batcher.stats(), "entities": entities_batcher.stats()}
+        }
+
+    return app
+
+
+class SidecarClient:
+    """Thread-safe client for the inference sidecar used by nlp_agent."""
+
+    def __init__(self, url: str = NLP_INFERENCE_URL):
+        self.url = url
+        self._client: Optional[httpx.Client] = None
+
+    @property
+    def client(self) -> httpx.Client:
+        if self._client is None:
+            if self.url.startswith("unix://"):
+                transport = httpx.HTTPTransport(uds=self.url[len("unix://"):])
+                self._client = httpx.Client(transport=transport, base_url="http://sidecar", timeout=INFERENCE_CLIENT_TIMEOUT_SECONDS)
+            else:
+                self._client = httpx.Client(base_url=self.url, timeout=INFERENCE_CLIENT_TIMEOUT_SECONDS)
+        return self._client
+
+    def classify(self, texts: List[str]) -> List[str]:
+        response = self.client.post("/classify", json={"texts": texts})
+        response.raise_for_status()
+        return response.json()["event_types"]
+
+    def entities(self, texts: List[str]) -> List[List[dict]]:
+        response = self.client.post("/entities", json={"texts": texts})
+        response.raise_for_status()
+        return response.json()["entities"]
+
+    def health(self) -> dict:
+        """Sidecar /health, or {"ready": False, "error": ...} when it cannot be reached."""
+        try:
+            response = self.client.get("/health", timeout=2.0)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            return {"ready": False, "error": type(e).__name__}
+
+
+# Shared client instance used by the agents
+sidecar_client = SidecarClient()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EventCulture NLP inference sidecar")
+    parser.add_argument("--socket", default=INFERENCE_SOCKET, help="Unix socket to listen on (default)")
+    parser.add_argument("--host", help="listen on TCP host instead of the Unix socket")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    import uvicorn
+    if args.host:
+        uvicorn.run(create_app(), host=args.host, port=args.port, workers=1)
+    else:
+        if os.path.exists(args.socket):
+            os.remove(args.socket)
+        uvicorn.run(create_app(), uds=args.socket, workers=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Dict, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Cache settings
+LLM_CACHE_PATH = os.getenv(
+    "LLM_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "llm_cache.sqlite3")
+)
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(6 * 60 * 60)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2000"))
+LLM_CACHE_DISABLED = os.getenv("LLM_CACHE_DISABLED", "false").lower() in ["1", "true", "yes"]
+
+
+class LLMResponseCache:
+    """SQLite-backed LLM response cache keyed by a hash of the model name and prompt.
+
+    Entries expire after ``ttl_seconds`` and the least recently used entries are
+    evicted once the cache holds more than ``max_entries`` rows.
+    """
+
+    def __init__(self, path: str = LLM_CACHE_PATH, ttl_seconds: int = LLM_CACHE_TTL_SECONDS, max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_responses (
+                    cache_key TEXT PRIMARY KEY,
+                    model_name TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_accessed REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_responses_last_accessed ON llm_responses (last_accessed)")
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def make_key(model_name: str, prompt: str) -> str:
+        return hashlib.sha256(f"{model_name}\n{prompt}".encode("utf-8")).hexdigest()
+
+    def get(self, model_name: str, prompt: str) -> Optional[str]:
+        """Return the cached response for this model and prompt, or None on a miss."""
+        key = self.make_key(model_name, prompt)
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connection()
+                row = conn.execute(
+                    "SELECT response, created_at FROM llm_responses WHERE cache_key = ?", (key,)
+                ).fetchone()
+                if row and now - row[1] <= self.ttl_seconds:
+                    conn.execute("UPDATE llm_responses SET last_accessed = ? WHERE cache_key = ?", (now, key))
+                    conn.commit()
+                    self.hits += 1
+                    return row[0]
+                if row:
+                    # Expired entry
+                    conn.execute("DELETE FROM llm_responses WHERE cache_key = ?", (key,))
+                    conn.commit()
+                self.misses += 1
+                return None
+        except sqlite3.Error as e:
+            logger.warning(f"[LLM Cache] Lookup failed: {e}")
+            self.misses += 1
+            return None
+
+    def set(self, model_name: str, prompt: str, response: str) -> None:
+        """Store a response and evict least recently used entries beyond max_entries."""
+        key = self.make_key(model_name, prompt)
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_responses (cache_key, model_name, response, created_at, last_accessed) VALUES (?, ?, ?, ?, ?)",
+                    (key, model_name, response, now, now)
+                )
+                conn.execute(
+                    """
+                    DELETE FROM llm_responses WHERE cache_key IN (
+                        SELECT cache_key FROM llm_responses ORDER BY last_accessed DESC LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (self.max_entries,)
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"[LLM Cache] Store failed: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM llm_responses")
+            conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+# Shared cache instance used by the agents
+response_cache = LLMResponseCache()
@@ -0,0 +1,204 @@
+import os
+import time
+import random
+import hashlib
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+import google.generativeai as genai
+from agents.single_flight import llm_flight
+from agents.resilience import CircuitOpenError, get_breaker
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Gateway settings
+LLM_MODEL_NAME = os.getenv("LLM_MODEL_NAME", "gemini-2.5-flash")
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))  # across all agents
+LLM_AGENT_MAX_CONCURRENCY = int(os.getenv("LLM_AGENT_MAX_CONCURRENCY", "4"))  # per agent
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))  # across all agents, 0 disables
+LLM_AGENT_REQUESTS_PER_MINUTE = float(os.getenv("LLM_AGENT_REQUESTS_PER_MINUTE", "30"))  # per agent, 0 disables
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "1.0"))
+LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "30"))
+LLM_REQUEST_TIMEOUT_SECONDS = float(os.getenv("LLM_REQUEST_TIMEOUT_SECONDS", "60"))
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+
+
+class RateLimiter:
+    """Thread-safe token bucket allowing `per_minute` requests per minute."""
+
+    def __init__(self, per_minute: float):
+        self.per_minute = per_minute
+        self.capacity = max(1.0, per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.per_minute <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.per_minute / 60.0)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) * 60.0 / self.per_minute
+            time.sleep(wait)
+
+
+class LLMGateway:
+    """Single entry point for Gemini calls from every agent.
+
+    Calls are limited by a global and a per-agent concurrency cap and
+    requests-per-minute limiter, retried with jittered exponential backoff on
+    429/5xx errors, and counted per agent (calls, retries, latency, tokens).
+    """
+
+    def __init__(self):
+        self._models: Dict[str, genai.GenerativeModel] = {}
+        self._global_slots = threading.BoundedSemaphore(max(1, LLM_MAX_CONCURRENCY))
+        self._global_rate = RateLimiter(LLM_REQUESTS_PER_MINUTE)
+        self._agent_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._agent_rates: Dict[str, RateLimiter] = {}
+        self._stats: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        # Async callers wait in this pool so they never tie up the default executor
+        self._executor = ThreadPoolExecutor(max_workers=max(4, LLM_MAX_CONCURRENCY * 4), thread_name_prefix="llm-gateway")
+
+    def get_model(self, model_name: str = LLM_MODEL_NAME) -> genai.GenerativeModel:
+        with self._lock:
+            if model_name not in self._models:
+                self._models[model_name] = genai.GenerativeModel(model_name)
+            return self._models[model_name]
+
+    def _agent_limits(self, agent: str):
+        with self._lock:
+            if agent not in self._agent_slots:
+                self._agent_slots[agent] = threading.BoundedSemaphore(max(1, LLM_AGENT_MAX_CONCURRENCY))
+                self._agent_rates[agent] = RateLimiter(LLM_AGENT_REQUESTS_PER_MINUTE)
+                self._stats[agent] = {
+                    "calls": 0, "failures": 0, "retries": 0,
+                    "latency_seconds_total": 0.0, "latency_seconds_max": 0.0,
+                    "prompt_tokens": 0, "output_tokens": 0, "total_tokens": 0
+                }
+            return self._agent_slots[agent], self._agent_rates[agent]
+
+    def _record(self, agent: str, latency: float, response=None, failed: bool = False, retries: int = 0) -> None:
+        usage = getattr(response, "usage_metadata", None)
+        with self._lock:
+            stats = self._stats[agent]
+            stats["calls"] += 1
+            stats["retries"] += retries
+            if failed:
+                stats["failures"] += 1
+            stats["latency_seconds_total"] += latency
+            stats["latency_seconds_max"] = max(stats["latency_seconds_max"], latency)
+            if usage is not None:
+                stats["prompt_tokens"] += getattr(usage, "prompt_token_count", 0) or 0
+                stats["output_tokens"] += getattr(usage, "candidates_token_count", 0) or 0
+                stats["total_tokens"] += getattr(usage, "total_token_count", 0) or 0
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        code = getattr(error, "code", None)
+        if callable(code):
+            # grpc-style errors expose code() instead of an attribute
+            code = None
+        try:
+            return int(code) in RETRYABLE_STATUS_CODES
+        except (TypeError, ValueError):
+            return "429" in str(error) or "503" in str(error) or "500" in str(error)
+
+    def generate_sync(self, prompt: str, agent: str = "default", model_name: str = LLM_MODEL_NAME, **kwargs) -> str:
+        """Blocking call returning the response text. Raises once retries are exhausted.
+
+        Identical prompts already in flight share that call instead of making another.
+        It can sleep for rate limits and retry backoff, so async code should use
+        ``generate`` or call it through ``run_in_executor``.
+        """
+        key = hashlib.sha256(f"{model_name}\n{sorted(kwargs.items())!r}\n{prompt}".encode("utf-8")).hexdigest()
+        return llm_flight.do(key, self._generate, prompt, agent, model_name, **kwargs)
+
+    def _generate(self, prompt: str, agent: str, model_name: str, **kwargs) -> str:
+        agent_slots, agent_rate = self._agent_limits(agent)
+        model = self.get_model(model_name)
+        breaker = get_breaker("gemini")
+        kwargs.setdefault("request_options", {"timeout": LLM_REQUEST_TIMEOUT_SECONDS})
+        retries = 0
+        while True:
+            try:
+                # Fail fast while Gemini is unhealthy so callers drop straight to their fallbacks
+                breaker.allow()
+            except CircuitOpenError:
+                self._record(agent, 0.0, failed=True, retries=retries)
+                raise
+            # Rate-limit waits happen under the agent's slot only; a global slot is taken
+            # just before sending, so a throttled agent never holds capacity other agents need
+            with agent_slots:
+                agent_rate.acquire()
+                self._global_rate.acquire()
+                with self._global_slots:
+                    started = time.perf_counter()
+                    try:
+                        response = model.generate_content(prompt, **kwargs)
+                        text = response.text
+                    except Exception as e:
+                        error = e
+                    else:
+                        breaker.record_success(time.perf_counter() - started)
+                        self._record(agent, time.perf_counter() - started, response, retries=retries)
+                        return text
+
+            retryable = self._is_retryable(error) or isinstance(error, TimeoutError)
+            if retryable:
+                breaker.record_failure()
+            else:
+                # Gemini answered; the request itself was bad
+                breaker.record_success()
+            if retries >= LLM_MAX_RETRIES or not retryable:
+                self._record(agent, time.perf_counter() - started, failed=True, retries=retries)
+                logger.warning(f"[LLM Gateway] {agent} call failed after {retries} retries: {error}")
+                raise error
+            delay = random.uniform(0, min(LLM_BACKOFF_MAX_SECONDS, LLM_BACKOFF_BASE_SECONDS * (2 ** retries)))
+            retries += 1
+            logger.info(f"[LLM Gateway] {agent} retry {retries}/{LLM_MAX_RETRIES} in {delay:.1f}s: {error}")
+            time.sleep(delay)
+
+    async def generate(self, prompt: str, agent: str = "default", model_name: str = LLM_MODEL_NAME, **kwargs) -> str:
+        """Async call returning the response text, without blocking the event loop."""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._executor, lambda: self.generate_sync(prompt, agent, model_name, **kwargs))
+
+    def usage_stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            stats = {}
+            for agent, agent_stats in self._stats.items():
+                stats[agent] = dict(agent_stats)
+                stats[agent]["latency_seconds_avg"] = round(agent_stats["latency_seconds_total"] / agent_stats["calls"], 3) if agent_stats["calls"] else 0.0
+            return stats
+
+
+# Shared gateway used by every agent
+gateway = LLMGateway()
+
+def generate_sync(prompt: str, agent: str = "default", model_name: str = LLM_MODEL_NAME, **kwargs) -> str:
+    return gateway.generate_sync(prompt, agent, model_name, **kwargs)
+
+async def generate(prompt: str, agent: str = "default", model_name: str = LLM_MODEL_NAME, **kwargs) -> str:
+    return await gateway.generate(prompt, agent, model_name, **kwargs)
+
+def get_usage_stats() -> Dict[str, Dict]:
+    return gateway.usage_stats()
+
+def is_transient_error(error: Exception) -> bool:
+    """Whether a failed call says Gemini is unavailable or over quota, rather than rejecting the request."""
+    return isinstance(error, (CircuitOpenError, TimeoutError)) or LLMGateway._is_retryable(error)
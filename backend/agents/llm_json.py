@@ -0,0 +1,202 @@
+import os
+import re
+import json
+import logging
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from agents.llm_gateway import generate, generate_sync
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Ask Gemini for application/json output constrained by a response schema
+LLM_JSON_MODE = os.getenv("LLM_JSON_MODE", "true").lower() in ["1", "true", "yes"]
+
+_decoder = json.JSONDecoder()
+
+# Response schemas (OpenAPI subset accepted by Gemini's response_schema)
+EVENT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "event_name": {"type": "string"},
+        "location": {"type": "string"},
+        "date": {"type": "string", "description": "yyyy-mm-dd", "nullable": True},
+        "description": {"type": "string"},
+        "booking_url": {"type": "string", "nullable": True},
+        "source": {"type": "string", "nullable": True}
+    },
+    "required": ["event_name", "location", "date", "description"]
+}
+
+EVENT_LIST_SCHEMA = {"type": "array", "items": EVENT_SCHEMA}
+
+EVENT_ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string"},
+        "tags": {"type": "array", "items": {"type": "string"}},
+        "sentiment": {"type": "string", "enum": ["exciting", "formal", "casual", "neutral"]}
+    },
+    "required": ["summary", "tags", "sentiment"]
+}
+
+# Several events analysed in one request, each answer tagged with the id it was given
+EVENT_ANALYSIS_BATCH_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {"id": {"type": "string"}, **EVENT_ANALYSIS_SCHEMA["properties"]},
+        "required": ["id"] + EVENT_ANALYSIS_SCHEMA["required"]
+    }
+}
+
+def keyed_event_lists_schema(keys: List[str]) -> Dict:
+    """Schema for an object mapping each key (e.g. a query id) to a list of events."""
+    return {
+        "type": "object",
+        "properties": {key: EVENT_LIST_SCHEMA for key in keys},
+        "required": list(keys)
+    }
+
+_JSON_TYPES = {"object": dict, "array": list, "string": str, "boolean": bool, "integer": int, "number": (int, float)}
+
+def matches_schema(value: Any, schema: Optional[Dict]) -> bool:
+    """Check a parsed value against the response-schema subset used here (type, required, properties, items, enum, nullable)."""
+    if not schema:
+        return True
+    if value is None:
+        return bool(schema.get("nullable"))
+    expected = _JSON_TYPES.get(schema.get("type"))
+    if expected and not isinstance(value, expected):
+        return False
+    if "enum" in schema and value not in schema["enum"]:
+        return False
+    if isinstance(value, dict):
+        if any(key not in value for key in schema.get("required", [])):
+            return False
+        return all(matches_schema(value[key], sub) for key, sub in schema.get("properties", {}).items() if key in value)
+    if isinstance(value, list) and "items" in schema:
+        return all(matches_schema(item, schema["items"]) for item in value)
+    return True
+
+def json_generation_config(schema: Optional[Dict] = None) -> Optional[Dict]:
+    if not LLM_JSON_MODE:
+        return None
+    config = {"response_mime_type": "application/json"}
+    if schema:
+        config["response_schema"] = schema
+    return config
+
+
+def strip_code_fences(text: str) -> str:
+    text = (text or "").strip()
+    text = re.sub(r"^```[a-zA-Z]*\s*", "", text)
+    text = re.sub(r"\s*```$", "", text)
+    return text.strip()
+
+def _skip_separators(text: str, pos: int) -> int:
+    while pos < len(text) and text[pos] in " \t\r\n,":
+        pos += 1
+    return pos
+
+def iter_json_array(text: str, start: int = 0) -> Iterator[Any]:
+    """Yield each complete element of the JSON array beginning at or after ``start``.
+
+    A malformed element is skipped by resynchronising on the next ``}, {``
+    boundary; a truncated or malformed tail simply ends the iteration.
+    """
+    pos = text.find("[", start)
+    if pos < 0:
+        return
+    pos += 1
+    while True:
+        pos = _skip_separators(text, pos)
+        if pos >= len(text) or text[pos] == "]":
+            return
+        try:
+            value, pos = _decoder.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            boundary = re.compile(r"\}\s*,\s*(?=\{)").search(text, pos)
+            if not boundary:
+                return
+            pos = boundary.end()
+            continue
+        yield value
+
+def parse_json_array(text: str) -> Tuple[List[Any], bool]:
+    """Parse a JSON array, salvaging complete elements. Returns (items, fully_parsed)."""
+    text = strip_code_fences(text)
+    try:
+        value = json.loads(text)
+        if isinstance(value, list):
+            return value, True
+    except json.JSONDecodeError:
+        pass
+    return list(iter_json_array(text)), False
+
+def parse_json_object(text: str) -> Tuple[Dict, bool]:
+    """Parse a JSON object, salvaging complete members. Returns (object, fully_parsed).
+
+    When a member's value is an array cut off part-way, its complete elements are kept.
+    """
+    text = strip_code_fences(text)
+    try:
+        value = json.loads(text)
+        if isinstance(value, dict):
+            return value, True
+    except json.JSONDecodeError:
+        pass
+
+    result = {}
+    pos = text.find("{")
+    if pos < 0:
+        return result, False
+    pos += 1
+    while True:
+        pos = _skip_separators(text, pos)
+        if pos >= len(text) or text[pos] != '"':
+            break
+        try:
+            key, pos = _decoder.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            break
+        pos = _skip_separators(text, pos)
+        if pos >= len(text) or text[pos] != ":":
+            break
+        pos = _skip_separators(text, pos + 1)
+        try:
+            result[key], pos = _decoder.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            if text.startswith("[", pos):
+                result[key] = list(iter_json_array(text, pos))
+            break
+    return result, False
+
+def parse_json_response(text: str, expect: str = "array") -> Tuple[Any, bool]:
+    if expect == "object":
+        return parse_json_object(text)
+    return parse_json_array(text)
+
+
+def _log_salvage(agent: str, value: Any, complete: bool) -> None:
+    if not complete:
+        logger.warning(f"[LLM JSON] {agent}: malformed response, salvaged {len(value)} item(s)")
+
+async def generate_json(prompt: str, agent: str, schema: Optional[Dict] = None, expect: str = "array") -> Tuple[Any, bool, str]:
+    """Request JSON output from Gemini and parse it tolerantly.
+
+    Returns (value, fully_parsed, raw_text); ``value`` is always a list or dict
+    matching ``expect``, possibly partial or empty.
+    """
+    config = json_generation_config(schema)
+    text = await generate(prompt, agent=agent, **({"generation_config": config} if config else {}))
+    value, complete = parse_json_response(text, expect)
+    _log_salvage(agent, value, complete)
+    return value, complete, text
+
+def generate_json_sync(prompt: str, agent: str, schema: Optional[Dict] = None, expect: str = "array") -> Tuple[Any, bool, str]:
+    """Blocking variant of generate_json."""
+    config = json_generation_config(schema)
+    text = generate_sync(prompt, agent=agent, **({"generation_config": config} if config else {}))
+    value, complete = parse_json_response(text, expect)
+    _log_salvage(agent, value, complete)
+    return value, complete, text
@@ -1,20 +1,25 @@
 import os
 import json
-import google.generativeai as genai
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 import httpx
 import asyncio
 import logging
 from datetime import datetime
 from db.database import SessionLocal
 from db.models import Event
+from agents.llm_gateway import generate_sync
+from agents.single_flight import geocode_flight, normalize_key
+from agents.resilience import call_with_breaker
+from agents.crawler import CRAWLER_USER_AGENT
+from agents.event_work import AGENT_WORK_CHUNK_SIZE, STATUS_DONE, iter_event_chunks, mark_events_done, mark_events_failed
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-model = genai.GenerativeModel("gemini-2.5-flash")
+LLM_AGENT_NAME = "location_agent"
+NOMINATIM_TIMEOUT_SECONDS = float(os.getenv("NOMINATIM_TIMEOUT_SECONDS", "10"))
+DIRECTIONS_TIMEOUT_SECONDS = float(os.getenv("DIRECTIONS_TIMEOUT_SECONDS", "15"))
 
 def refine_location_with_llm(raw_location: str, description: str) -> str:
     prompt = f"""
@@ -27,42 +32,49 @@ def refine_location_with_llm(raw_location: str, description: str) -> str:
     """
 
     try:
-        response = model.generate_content(prompt) 
-        return response.text.strip("```").strip()
+        return generate_sync(prompt, agent=LLM_AGENT_NAME).strip("```").strip()
     except Exception as e:
         return raw_location
 
 def geocode_location(location: str) -> Optional[Dict]:
-    """Geocode a location to get coordinates for OpenLayers mapping."""
+    """Geocode a location to get coordinates for OpenLayers mapping.
+
+    Concurrent lookups of the same place share one Nominatim request.
+    """
+    return geocode_flight.do(normalize_key("geocode", location), _geocode_location, location)
+
+def _geocode_location(location: str) -> Optional[Dict]:
     try:
-        # Using a free geocoding service (you can replace with Google Maps Geocoding API)
-        async def fetch_coordinates():
-            async with httpx.AsyncClient() as client:
-                # Using OpenStreetMap Nominatim (free, no API key required)
-                url = f"https://nominatim.openstreetmap.org/search"
-                params = {
-                    "q": location,
-                    "format": "json",
-                    "limit": 1,
-                    "countrycodes": "lk"  # Limit to Sri Lanka
-                }
-                response = await client.get(url, params=params)
-                if response.status_code == 200:
-                    data = response.json()
-                    if data:
-                        return {
-                            "lat": float(data[0]["lat"]),
-                            "lon": float(data[0]["lon"]),
-                            "display_name": data[0]["display_name"]
-                        }
-                return None
-        
-        import asyncio
-        return asyncio.run(fetch_coordinates())
+        # Fails fast to "no coordinates" while Nominatim is unhealthy
+        return call_with_breaker("nominatim", _fetch_coordinates, location)
     except Exception as e:
         print(f"Geocoding error: {e}")
         return None
 
+def _fetch_coordinates(location: str) -> Optional[Dict]:
+    # Using a free geocoding service (you can replace with Google Maps Geocoding API)
+    with httpx.Client(timeout=NOMINATIM_TIMEOUT_SECONDS, headers={"User-Agent": CRAWLER_USER_AGENT}) as client:
+        # Using OpenStreetMap Nominatim (free, no API key required)
+        url = f"https://nominatim.openstreetmap.org/search"
+        params = {
+            "q": location,
+            "format": "json",
+            "limit": 1,
+            "countrycodes": "lk"  # Limit to Sri Lanka
+        }
+        response = client.get(url, params=params)
+    if response.status_code == 429 or response.status_code >= 500:
+        response.raise_for_status()
+    if response.status_code == 200:
+        data = response.json()
+        if data:
+            return {
+                "lat": float(data[0]["lat"]),
+                "lon": float(data[0]["lon"]),
+                "display_name": data[0]["display_name"]
+            }
+    return None
+
 def is_virtual_event(location: str, description: str) -> bool:
     """Determine if an event is virtual/online."""
     virtual_keywords = [
@@ -153,9 +165,7 @@ def get_directions(from_location: str, to_location: str, travel_mode: str = "dri
         params["transit_mode"] = "rail"
 
     try:
-        with httpx.Client(timeout=15.0) as client:
-            resp = client.get("https://maps.googleapis.com/maps/api/directions/json", params=params)
-            data = resp.json()
+        data = call_with_breaker("directions", _fetch_directions, params)
 
         if data.get("status") != "OK" or not data.get("routes"):
             message = data.get("status") or "Directions request failed"
@@ -207,6 +217,13 @@ def get_directions(from_location: str, to_location: str, travel_mode: str = "dri
             "directions_url": f"https://www.google.com/maps/dir/?api=1&origin={from_location}&destination={to_location}&travelmode={mode}"
         }
 
+def _fetch_directions(params: Dict) -> Dict:
+    with httpx.Client(timeout=DIRECTIONS_TIMEOUT_SECONDS) as client:
+        resp = client.get("https://maps.googleapis.com/maps/api/directions/json", params=params)
+    if resp.status_code >= 500:
+        resp.raise_for_status()
+    return resp.json()
+
 def get_multi_directions(from_location: str, to_location: str) -> Dict:
     """Return distance and time summaries for car, bus, and train."""
     modes = [
@@ -378,21 +395,20 @@ def get_landmark_routes(event_location: str, event_coordinates: Dict) -> List[Di
     
     return routes
 
-def get_unprocessed_events() -> List[Event]:
-    """Get events that haven't been processed for location data yet."""
-    db = SessionLocal()
+def iter_unprocessed_event_chunks(chunk_size: int = AGENT_WORK_CHUNK_SIZE) -> Iterator[List[Event]]:
+    """Yield keyset-paginated pages of events still pending location processing or due for a retry."""
+    return iter_event_chunks("location", chunk_size)
+
+def get_unprocessed_events(limit: Optional[int] = None) -> List[Event]:
+    """Get events that haven't been processed for location data yet (at most ``limit``)."""
+    events = []
     try:
-        # Get events that don't have coordinates
-        events = db.query(Event).filter(
-            (Event.location.isnot(None)) & 
-            (Event.location != "")
-        ).all()
+        for chunk in iter_event_chunks("location", AGENT_WORK_CHUNK_SIZE, limit):
+            events.extend(chunk)
         return events
     except Exception as e:
         logger.error(f"Error retrieving events for location processing: {e}")
         return []
-    finally:
-        db.close()
 
 def update_event_location_data(event_id: int, location_data: Dict) -> bool:
     """Update event with enhanced location data."""
@@ -410,6 +426,8 @@ def update_event_location_data(event_id: int, location_data: Dict) -> bool:
             event.location = f"{location_data['location_name']}|{location_data['coordinates']['lat']},{location_data['coordinates']['lon']}"
         else:
             event.location = location_data['location_name']
+        event.location_status = STATUS_DONE
+        event.location_retry_after = None
         
         db.commit()
         logger.info(f"Successfully updated event {event_id} with location data")
@@ -431,11 +449,12 @@ async def process_single_event_location(event: Event) -> bool:
             logger.warning(f"Event {event.id} has no location to process")
             return False
         
-        # Get location data
-        location_data = get_location_data(raw_location, description, "free")  # Process for all users
+        # Geocoding and the LLM refinement block (rate limits, retry backoff), so they run off the event loop
+        loop = asyncio.get_running_loop()
+        location_data = await loop.run_in_executor(None, get_location_data, raw_location, description, "free")  # Process for all users
         
         # Update the event
-        success = update_event_location_data(event.id, location_data)
+        success = await loop.run_in_executor(None, update_event_location_data, event.id, location_data)
         
         if success:
             logger.info(f"Successfully processed location for event: {event.event_name}")
@@ -447,14 +466,46 @@ async def process_single_event_location(event: Event) -> bool:
         logger.error(f"Error processing location for event {event.id}: {e}")
         return False
 
-async def batch_process_event_locations() -> Dict:
-    """Process all events for location data in batch."""
-    logger.info("Starting location processing for all events...")
+async def batch_process_event_locations(chunk_size: int = AGENT_WORK_CHUNK_SIZE) -> Dict:
+    """Process events that still need location data, one keyset-paginated page at a time.
+
+    Only pending events and failed events due for a retry are fetched, so
+    events that were already geocoded are never processed again.
+    """
+    logger.info("Starting location processing...")
     
-    # Get all events
-    events = get_unprocessed_events()
+    total_events = 0
+    processed_count = 0
+    failed_count = 0
+    skipped_count = 0
     
-    if not events:
+    for events in iter_unprocessed_event_chunks(chunk_size):
+        total_events += len(events)
+        logger.info(f"Found {len(events)} events for location processing ({total_events} so far)")
+        # Events without a location have nothing to geocode
+        no_location = [event.id for event in events if not (event.location or "").strip()]
+        failed_events = []
+        
+        # Process each event
+        for event in events:
+            if not (event.location or "").strip():
+                continue
+            try:
+                success = await process_single_event_location(event)
+            except Exception as e:
+                logger.error(f"Failed to process location for event {event.id}: {e}")
+                success = False
+            if success:
+                processed_count += 1
+            else:
+                failed_events.append(event)
+        
+        mark_events_done("location", no_location)
+        mark_events_failed("location", failed_events)
+        skipped_count += len(no_location)
+        failed_count += len(failed_events)
+    
+    if not total_events:
         logger.info("No events found for location processing")
         return {
             "status": "success",
@@ -463,31 +514,15 @@ async def batch_process_event_locations() -> Dict:
             "total_events": 0
         }
     
-    logger.info(f"Found {len(events)} events for location processing")
-    
-    processed_count = 0
-    failed_count = 0
-    
-    # Process each event
-    for event in events:
-        try:
-            success = await process_single_event_location(event)
-            if success:
-                processed_count += 1
-            else:
-                failed_count += 1
-        except Exception as e:
-            logger.error(f"Failed to process location for event {event.id}: {e}")
-            failed_count += 1
-    
-    logger.info(f"Location processing completed. Processed: {processed_count}, Failed: {failed_count}")
+    logger.info(f"Location processing completed. Processed: {processed_count}, Failed: {failed_count}, Skipped: {skipped_count}")
     
     return {
         "status": "success",
         "message": f"Processed {processed_count} event locations successfully",
         "processed_count": processed_count,
         "failed_count": failed_count,
-        "total_events": len(events)
+        "skipped_count": skipped_count,
+        "total_events": total_events
     }
 
 def get_google_maps_data(event_id: int, user_location: str = None) -> Dict:
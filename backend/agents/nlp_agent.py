@@ -1,32 +1,136 @@
 from fastapi import APIRouter
 from pydantic import ValidationError
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import bindparam
 import os
-import google.generativeai as genai
-import json
-import spacy
-from transformers import pipeline
+import time
 from datetime import datetime
 import asyncio
 import logging
+import threading
 from db.database import SessionLocal
 from db.models import Event
+from agents.llm_json import generate_json, EVENT_ANALYSIS_SCHEMA, EVENT_ANALYSIS_BATCH_SCHEMA
+from agents.llm_gateway import is_transient_error
+from agents.classifier_backends import build_classifier, NLP_CLASSIFIER_BACKEND
+from agents.resilience import call_with_breaker
+from agents.nlp_cache import NLP_PIPELINE_VERSION, content_hash, get_cached_result, get_cached_results, store_result, flush_hits
+from agents.event_work import (
+    AGENT_WORK_CHUNK_SIZE, STATUS_DONE, STATUS_FAILED, iter_event_chunks, iter_keyset,
+    mark_events_failed, next_retry_after
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Configure Gemini API
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-model = genai.GenerativeModel("gemini-2.5-flash")
+# Gemini calls go through the shared LLM gateway under this agent name
+LLM_AGENT_NAME = "nlp_agent"
 
-# Load spaCy and transformers
-try:
-    nlp_spacy = spacy.load("en_core_web_lg")  # Larger model for better entities
-except OSError:
-    # Fallback to smaller model if large model not available
-    nlp_spacy = spacy.load("en_core_web_sm")
-classifier = pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
+# Batch sizes for NLP backfills
+NLP_CLASSIFIER_BATCH_SIZE = int(os.getenv("NLP_CLASSIFIER_BATCH_SIZE", "8"))  # sequence pairs per forward pass
+NLP_EVENT_BATCH_SIZE = int(os.getenv("NLP_EVENT_BATCH_SIZE", "32"))  # events classified together
+NLP_SPACY_BATCH_SIZE = int(os.getenv("NLP_SPACY_BATCH_SIZE", "64"))  # texts per nlp.pipe batch
+NLP_SPACY_N_PROCESS = int(os.getenv("NLP_SPACY_N_PROCESS", "1"))  # worker processes for nlp.pipe
+NLP_SUMMARY_BATCH_SIZE = int(os.getenv("NLP_SUMMARY_BATCH_SIZE", "10"))  # event descriptions per Gemini request
+NLP_BATCH_CONCURRENCY = int(os.getenv("NLP_BATCH_CONCURRENCY", "4"))  # event chunks processed at once
+NLP_WRITE_CHUNK_SIZE = int(os.getenv("NLP_WRITE_CHUNK_SIZE", "200"))  # rows per bulk UPDATE transaction
+
+# Only doc.ents is used, so components that NER does not depend on are never loaded
+SPACY_EXCLUDED_COMPONENTS = ["parser", "lemmatizer", "attribute_ruler", "tagger", "senter"]
+
+# Shared inference sidecar (python -m agents.inference_sidecar), e.g. unix:///tmp/eventculture-nlp.sock or
+# http://127.0.0.1:8765. When set, classification and entity extraction run there instead of in this process
+NLP_INFERENCE_URL = os.getenv("NLP_INFERENCE_URL", "")
+# Loading the models locally when the sidecar fails brings back a full model copy per worker,
+# so it must be opted into; by default sidecar failures fail the NLP call and the event is retried later
+NLP_INFERENCE_LOCAL_FALLBACK = os.getenv("NLP_INFERENCE_LOCAL_FALLBACK", "false").lower() in ["1", "true", "yes"]
+
+# Load the NLP models in a background thread when the app starts instead of on first use
+NLP_WARMUP_ON_STARTUP = os.getenv("NLP_WARMUP_ON_STARTUP", "false").lower() in ["1", "true", "yes"]
+
+# Events processed by an older pipeline version that are re-run per batch; 0 disables reprocessing
+NLP_REPROCESS_LIMIT = int(os.getenv("NLP_REPROCESS_LIMIT", "100"))
+
+# Summary stored when Gemini gives no usable analysis; such results are not cached or version-stamped
+FALLBACK_SUMMARY = "Event details available upon request."
+
+CANDIDATE_LABELS = ["music", "tech", "sports", "education", "food", "art", "business", "cultural", "fashion", "comedy", "theater", "photography", "visual", "other"]
+
+# spaCy and transformers models are loaded on first use, so processes that never run NLP
+# (e.g. web workers) do not pay for them
+_models = {}
+_model_status = {"spacy": "not_loaded", "classifier": "not_loaded"}
+_model_errors = {}
+_model_locks = {"spacy": threading.Lock(), "classifier": threading.Lock()}
+
+def _load_spacy():
+    import spacy
+    try:
+        nlp_spacy = spacy.load("en_core_web_lg", exclude=SPACY_EXCLUDED_COMPONENTS)  # Larger model for better entities
+    except OSError:
+        # Fallback to smaller model if large model not available
+        nlp_spacy = spacy.load("en_core_web_sm", exclude=SPACY_EXCLUDED_COMPONENTS)
+    try:
+        # The shared tok2vec only feeds the excluded components unless NER listens to it
+        if "tok2vec" in nlp_spacy.pipe_names and "ner" not in nlp_spacy.get_pipe("tok2vec").listening_components:
+            nlp_spacy.disable_pipe("tok2vec")
+    except Exception as e:
+        logger.warning(f"Could not trim spaCy tok2vec: {e}")
+    return nlp_spacy
+
+def _load_classifier():
+    # Backend (pytorch, quantized, onnx, distilled) is chosen with NLP_CLASSIFIER_BACKEND
+    return build_classifier(NLP_CLASSIFIER_BACKEND)
+
+_MODEL_LOADERS = {"spacy": _load_spacy, "classifier": _load_classifier}
+
+def _get_model(name: str):
+    if name in _models:
+        return _models[name]
+    with _model_locks[name]:
+        if name not in _models:
+            _model_status[name] = "loading"
+            logger.info(f"Loading NLP model: {name}")
+            try:
+                _models[name] = _MODEL_LOADERS[name]()
+            except Exception as e:
+                _model_status[name] = "failed"
+                _model_errors[name] = str(e)
+                raise
+            _model_status[name] = "ready"
+            _model_errors.pop(name, None)
+            logger.info(f"NLP model ready: {name}")
+    return _models[name]
+
+def get_spacy():
+    return _get_model("spacy")
+
+def get_classifier():
+    return _get_model("classifier")
+
+def warm_up_models() -> Dict:
+    """Load every NLP model now; returns the readiness status."""
+    for name in _MODEL_LOADERS:
+        try:
+            _get_model(name)
+        except Exception as e:
+            logger.error(f"Failed to load NLP model {name}: {e}")
+    return get_model_status()
+
+def start_background_warmup() -> threading.Thread:
+    """Load the NLP models in a daemon thread so startup is not blocked."""
+    thread = threading.Thread(target=warm_up_models, name="nlp-warmup", daemon=True)
+    thread.start()
+    return thread
+
+def get_model_status() -> Dict:
+    return {
+        "ready": all(state == "ready" for state in _model_status.values()),
+        "models": dict(_model_status),
+        "classifier_backend": NLP_CLASSIFIER_BACKEND,
+        "errors": dict(_model_errors)
+    }
 
 def is_virtual_event(location: str, description: str) -> bool:
     """Determine if an event is virtual/online."""
@@ -42,15 +146,57 @@ def is_virtual_event(location: str, description: str) -> bool:
     
     return any(keyword in text_to_check for keyword in virtual_keywords)
 
+def _sidecar_enabled(classifier=None) -> bool:
+    return bool(NLP_INFERENCE_URL) and classifier is None
+
+def _call_sidecar(method: str, *args):
+    """Run a request on the inference sidecar; returns None to fall back to local models when that is enabled."""
+    from agents.inference_sidecar import sidecar_client
+    try:
+        return call_with_breaker("inference_sidecar", getattr(sidecar_client, method), *args)
+    except Exception as e:
+        if not NLP_INFERENCE_LOCAL_FALLBACK:
+            raise
+        logger.warning(f"Inference sidecar unavailable, using local models: {e}")
+        return None
+
 def extract_entities(text: str) -> List[dict]:
     """Extract named entities from text using spaCy."""
     try:
-        doc = nlp_spacy(text)
+        if _sidecar_enabled():
+            return extract_entities_batch([text])[0]
+        doc = get_spacy()(text)
         return [{"text": ent.text, "label": ent.label_} for ent in doc.ents]
     except Exception as e:
         logger.warning(f"Error extracting entities: {e}")
         return []
 
+def extract_entities_batch(texts: List[str], batch_size: int = NLP_SPACY_BATCH_SIZE, n_process: int = NLP_SPACY_N_PROCESS) -> List[List[dict]]:
+    """Extract named entities for many texts with nlp.pipe, in the same format as extract_entities."""
+    if _sidecar_enabled():
+        entities = _call_sidecar("entities", texts)
+        if entities is not None:
+            return entities
+    return extract_entities_batch_local(texts, batch_size, n_process)
+
+def extract_entities_batch_local(texts: List[str], batch_size: int = NLP_SPACY_BATCH_SIZE, n_process: int = NLP_SPACY_N_PROCESS) -> List[List[dict]]:
+    """extract_entities_batch using this process's spaCy model."""
+    try:
+        return [
+            [{"text": ent.text, "label": ent.label_} for ent in doc.ents]
+            for doc in get_spacy().pipe(texts, batch_size=max(1, batch_size), n_process=max(1, n_process))
+        ]
+    except Exception as e:
+        logger.warning(f"Batched entity extraction failed, extracting one at a time: {e}")
+        return [_extract_entities_local(text) for text in texts]
+
+def _extract_entities_local(text: str) -> List[dict]:
+    try:
+        return [{"text": ent.text, "label": ent.label_} for ent in get_spacy()(text).ents]
+    except Exception as e:
+        logger.warning(f"Error extracting entities: {e}")
+        return []
+
 def classify_event_type(text: str, location: str = "") -> str:
     """Classify event type using transformers."""
     try:
@@ -58,15 +204,74 @@ def classify_event_type(text: str, location: str = "") -> str:
         if is_virtual_event(location, text):
             return "visual"  # Mark virtual events as "visual" type
         
-        candidate_labels = ["music", "tech", "sports", "education", "food", "art", "business", "cultural", "fashion", "comedy", "theater", "photography", "visual", "other"]
-        result = classifier(text, candidate_labels, multi_label=False)
+        if _sidecar_enabled():
+            return classify_event_types([text], [location])[0]
+        result = get_classifier()(text, CANDIDATE_LABELS, multi_label=False)
         return result["labels"][0] if result["labels"] else "other"
     except Exception as e:
         logger.warning(f"Error classifying event type: {e}")
         return "other"
 
-async def process_event_text(text: str, location: str = "") -> Dict[str, any]:
-    """Process event text to generate summary, tags, and sentiment."""
+def classify_event_types(texts: List[str], locations: Optional[List[str]] = None, batch_size: int = NLP_CLASSIFIER_BATCH_SIZE, classifier=None) -> List[str]:
+    """Classify many events in one pipeline call, padded into mini-batches of ``batch_size``.
+
+    Returns the same labels as calling classify_event_type on each event. Pass
+    ``classifier`` to use a specific backend instead of the configured one.
+    """
+    locations = locations or [""] * len(texts)
+    event_types = ["visual" if is_virtual_event(location, text) else None for text, location in zip(texts, locations)]
+    pending = [i for i, event_type in enumerate(event_types) if event_type is None]
+    if not pending:
+        return event_types
+
+    if _sidecar_enabled(classifier):
+        remote_types = _call_sidecar("classify", [texts[i] for i in pending])
+        if remote_types is not None:
+            for i, event_type in zip(pending, remote_types):
+                event_types[i] = event_type
+            return event_types
+
+    try:
+        results = (classifier or get_classifier())([texts[i] for i in pending], CANDIDATE_LABELS, multi_label=False, batch_size=max(1, batch_size))
+        if isinstance(results, dict):
+            results = [results]
+        for i, result in zip(pending, results):
+            event_types[i] = result["labels"][0] if result["labels"] else "other"
+    except Exception as e:
+        if classifier is not None:
+            raise
+        logger.warning(f"Batched classification failed, classifying one at a time: {e}")
+        for i in pending:
+            event_types[i] = _classify_local(texts[i])
+    return event_types
+
+def _classify_local(text: str) -> str:
+    try:
+        result = get_classifier()(text, CANDIDATE_LABELS, multi_label=False)
+        return result["labels"][0] if result["labels"] else "other"
+    except Exception as e:
+        logger.warning(f"Error classifying event type: {e}")
+        return "other"
+
+VALID_SENTIMENTS = {"exciting", "formal", "casual", "neutral"}
+
+def _clean_analysis(parsed: Dict) -> Dict:
+    """Keep whichever analysis fields were recovered, falling back to the placeholder for the rest."""
+    analysis = {
+        "summary": FALLBACK_SUMMARY,
+        "tags": [],
+        "sentiment": "neutral"
+    }
+    if parsed.get("summary"):
+        analysis["summary"] = parsed["summary"]
+    if isinstance(parsed.get("tags"), list):
+        analysis["tags"] = parsed["tags"]
+    # Validate sentiment
+    if parsed.get("sentiment") in VALID_SENTIMENTS:
+        analysis["sentiment"] = parsed["sentiment"]
+    return analysis
+
+async def _request_event_analysis(text: str) -> Dict:
     prompt = f"""
     Analyze this event description and return a JSON object with:
     - summary (max 30 words, readable and engaging)
@@ -79,48 +284,171 @@ async def process_event_text(text: str, location: str = "") -> Dict[str, any]:
     Description:
     {text}
     """
+    parsed, _, _ = await generate_json(prompt, LLM_AGENT_NAME, EVENT_ANALYSIS_SCHEMA, expect="object")
+    if not parsed:
+        raise ValueError("no parseable JSON in Gemini response")
+    # Keep whichever fields were recovered, even from a truncated response
+    return _clean_analysis(parsed)
+
+async def analyze_event_text(text: str) -> Dict:
+    """Ask Gemini for the summary, tags and sentiment of one event."""
     try:
-        response = await asyncio.get_event_loop().run_in_executor(None, model.generate_content, prompt)
-        gemini_result = json.loads(response.text.strip("```json\n").strip("```"))
-        # Validate sentiment
-        valid_sentiments = {"exciting", "formal", "casual", "neutral"}
-        if gemini_result.get("sentiment") not in valid_sentiments:
-            gemini_result["sentiment"] = "neutral"
-    except (json.JSONDecodeError, Exception) as e:
+        return await _request_event_analysis(text)
+    except Exception as e:
         logger.warning(f"Error processing event text with Gemini: {e}")
-        gemini_result = {
-            "summary": "Event details available upon request.",
-            "tags": [],
-            "sentiment": "neutral"
-        }
+        return _clean_analysis({})
+
+async def analyze_event_texts(texts: List[str], batch_size: int = NLP_SUMMARY_BATCH_SIZE) -> List[Dict]:
+    """Analyse many events with ``batch_size`` descriptions per Gemini request.
+
+    Each description is sent with an id and the answers are mapped back by id.
+    Items missing from the response, or from a batch Gemini rejected, are
+    retried one by one, so one bad item never costs the rest of its batch
+    their analysis. Once Gemini is unavailable or over quota, the remaining
+    items get the fallback analysis instead of a retry each.
+    """
+    results: List[Optional[Dict]] = [None] * len(texts)
+    batch_size = max(1, batch_size)
+    gemini_down = False
+    for start in range(0, len(texts), batch_size):
+        if gemini_down:
+            break
+        indexes = list(range(start, min(start + batch_size, len(texts))))
+        if len(indexes) > 1:
+            descriptions = "\n\n".join(f"[id: {i}]\n{texts[i]}" for i in indexes)
+            prompt = f"""
+    Analyze each of these {len(indexes)} event descriptions and return a JSON array with one object per event:
+    - id (the id shown above the description)
+    - summary (max 30 words, readable and engaging)
+    - tags (3–5 relevant keywords)
+    - sentiment (exciting, formal, casual, neutral)
+
+    Ensure sentiment is one of: exciting, formal, casual, neutral.
+    Return valid JSON. No markdown or explanations.
+
+    Descriptions:
+    {descriptions}
+    """
+            try:
+                items, _, _ = await generate_json(prompt, LLM_AGENT_NAME, EVENT_ANALYSIS_BATCH_SCHEMA, expect="array")
+            except Exception as e:
+                logger.warning(f"Batched Gemini analysis of {len(indexes)} events failed: {e}")
+                items = []
+                gemini_down = is_transient_error(e)
+            ids = {str(i): i for i in indexes}
+            for item in items:
+                if isinstance(item, dict) and str(item.get("id")) in ids and item.get("summary"):
+                    results[ids[str(item["id"])]] = _clean_analysis(item)
 
-    entities = extract_entities(text)
-    event_type = classify_event_type(text, location)
+        missing = [i for i in indexes if results[i] is None]
+        if missing and not gemini_down:
+            if len(indexes) > 1:
+                logger.warning(f"Batched Gemini analysis missed {len(missing)} of {len(indexes)} events, retrying them one by one")
+            for i in missing:
+                try:
+                    results[i] = await _request_event_analysis(texts[i])
+                except Exception as e:
+                    logger.warning(f"Error processing event text with Gemini: {e}")
+                    if is_transient_error(e):
+                        gemini_down = True
+                        break
+    return [analysis or _clean_analysis({}) for analysis in results]
 
+def _build_result(analysis: Dict, event_type: str, entities: List[dict]) -> Dict:
     return {
-        "summary": gemini_result.get("summary", ""),
-        "tags": gemini_result.get("tags", []),
+        "summary": analysis.get("summary", ""),
+        "tags": analysis.get("tags", []),
         "event_type": event_type,
-        "sentiment": gemini_result.get("sentiment", "neutral"),
+        "sentiment": analysis.get("sentiment", "neutral"),
         "entities": entities
     }
 
-def get_unprocessed_events() -> List[Event]:
-    """Retrieve events that haven't been processed by NLP agent yet."""
-    db = SessionLocal()
+async def process_event_text(text: str, location: str = "", event_type: Optional[str] = None, entities: Optional[List[dict]] = None, use_cache: bool = True) -> Dict[str, any]:
+    """Process event text to generate summary, tags, and sentiment.
+
+    Pass ``event_type`` and ``entities`` when they were already computed as part of a batch.
+    Results are cached by content hash, so identical text and location under the same
+    pipeline version skip Gemini and the local models.
+    """
+    key = content_hash(text, location)
+    if use_cache:
+        cached = get_cached_result(key)
+        if cached:
+            return cached
+
+    analysis = await analyze_event_text(text)
+
+    # Model inference (or the sidecar round trip) runs off the event loop
+    loop = asyncio.get_event_loop()
+    if entities is None:
+        entities = await loop.run_in_executor(None, extract_entities, text)
+    if event_type is None:
+        event_type = await loop.run_in_executor(None, classify_event_type, text, location)
+
+    result = _build_result(analysis, event_type, entities)
+    if result["summary"] != FALLBACK_SUMMARY:
+        store_result(key, result)
+    return result
+
+async def process_event_texts(texts: List[str], locations: Optional[List[str]] = None, use_cache: bool = True) -> List[Dict]:
+    """Batched process_event_text: one result per text, in order.
+
+    Gemini sees NLP_SUMMARY_BATCH_SIZE descriptions per request, the local models
+    run once over the whole list, and identical content is only analysed once.
+    """
+    locations = locations or [""] * len(texts)
+    keys = [content_hash(text, location) for text, location in zip(texts, locations)]
+    results: List[Optional[Dict]] = [None] * len(texts)
+    loop = asyncio.get_event_loop()
+    if use_cache:
+        cached = await loop.run_in_executor(None, get_cached_results, keys)
+        results = [cached.get(key) for key in keys]
+
+    # First occurrence of each uncached content hash
+    pending, seen = [], set()
+    for i, key in enumerate(keys):
+        if results[i] is None and key not in seen:
+            seen.add(key)
+            pending.append(i)
+    if pending:
+        pending_texts = [texts[i] for i in pending]
+        event_types = await loop.run_in_executor(None, classify_event_types, pending_texts, [locations[i] for i in pending])
+        pending_entities = await loop.run_in_executor(None, extract_entities_batch, pending_texts)
+        analyses = await analyze_event_texts(pending_texts)
+
+        computed = {}
+        for i, analysis, event_type, entities in zip(pending, analyses, event_types, pending_entities):
+            computed[keys[i]] = _build_result(analysis, event_type, entities)
+        to_store = [(key, result) for key, result in computed.items() if result["summary"] != FALLBACK_SUMMARY]
+        if to_store:
+            await loop.run_in_executor(None, lambda: [store_result(key, result) for key, result in to_store])
+        results = [result if result is not None else computed[key] for result, key in zip(results, keys)]
+    return results
+
+def iter_unprocessed_event_chunks(chunk_size: int = AGENT_WORK_CHUNK_SIZE, reprocess_limit: int = NLP_REPROCESS_LIMIT) -> Iterator[List[Event]]:
+    """Yield keyset-paginated pages of events for the NLP agent.
+
+    Pending events come first, then failed events due for a retry, then up to
+    ``reprocess_limit`` done events whose results came from another pipeline
+    version, so an upgrade is rolled out a batch at a time.
+    """
+    yield from iter_event_chunks("nlp", chunk_size)
+    if reprocess_limit > 0:
+        stale = (Event.nlp_status == STATUS_DONE) & ((Event.nlp_version.is_(None)) | (Event.nlp_version != NLP_PIPELINE_VERSION))
+        yield from iter_keyset(stale, chunk_size, reprocess_limit)
+
+def get_unprocessed_events(limit: Optional[int] = None, reprocess_limit: int = NLP_REPROCESS_LIMIT) -> List[Event]:
+    """Retrieve events that haven't been processed by NLP agent yet (at most ``limit``)."""
+    events = []
     try:
-        # Get events that don't have summary, tags, or event_type set
-        events = db.query(Event).filter(
-            (Event.summary.is_(None)) | 
-            (Event.tags.is_(None)) | 
-            (Event.event_type.is_(None))
-        ).all()
+        for chunk in iter_unprocessed_event_chunks(reprocess_limit=reprocess_limit):
+            events.extend(chunk)
+            if limit is not None and len(events) >= limit:
+                return events[:limit]
         return events
     except Exception as e:
         logger.error(f"Error retrieving unprocessed events: {e}")
         return []
-    finally:
-        db.close()
 
 def update_event_with_nlp_data(event_id: int, nlp_data: Dict) -> bool:
     """Update event record with NLP processed data."""
@@ -131,12 +459,20 @@ def update_event_with_nlp_data(event_id: int, nlp_data: Dict) -> bool:
             logger.warning(f"Event {event_id} not found")
             return False
         
-        # Update event with NLP data
-        event.summary = nlp_data.get("summary", "")
-        event.tags = nlp_data.get("tags", [])
-        event.event_type = nlp_data.get("event_type", "other")
-        event.sentiment = nlp_data.get("sentiment", "neutral")
-        event.entities = nlp_data.get("entities", [])
+        # A placeholder result only schedules a retry; it never replaces existing NLP data
+        if nlp_data.get("summary", "") != FALLBACK_SUMMARY:
+            event.summary = nlp_data.get("summary", "")
+            event.tags = nlp_data.get("tags", [])
+            event.event_type = nlp_data.get("event_type", "other")
+            event.sentiment = nlp_data.get("sentiment", "neutral")
+            event.entities = nlp_data.get("entities", [])
+            event.nlp_version = NLP_PIPELINE_VERSION
+            event.nlp_status = STATUS_DONE
+            event.nlp_retry_after = None
+        else:
+            event.nlp_status = STATUS_FAILED
+            event.nlp_attempts = (event.nlp_attempts or 0) + 1
+            event.nlp_retry_after = next_retry_after(event.nlp_attempts)
         
         db.commit()
         logger.info(f"Successfully updated event {event_id} with NLP data")
@@ -148,18 +484,71 @@ def update_event_with_nlp_data(event_id: int, nlp_data: Dict) -> bool:
     finally:
         db.close()
 
-async def process_single_event(event: Event) -> bool:
+NLP_UPDATE_FIELDS = ["summary", "tags", "event_type", "sentiment", "entities", "nlp_version"]
+
+def _nlp_row(event_id: int, nlp_data: Dict) -> Dict:
+    return {
+        "_id": event_id,
+        "_summary": nlp_data.get("summary", ""),
+        "_tags": nlp_data.get("tags", []),
+        "_event_type": nlp_data.get("event_type", "other"),
+        "_sentiment": nlp_data.get("sentiment", "neutral"),
+        "_entities": nlp_data.get("entities", []),
+        "_nlp_version": NLP_PIPELINE_VERSION
+    }
+
+def bulk_update_events_with_nlp_data(updates: List[Tuple[int, Dict]], chunk_size: int = NLP_WRITE_CHUNK_SIZE) -> Dict:
+    """Write many NLP results with one executemany UPDATE and one commit per chunk.
+
+    Rows are marked done. Pass only real results: placeholder results go to
+    mark_events_failed instead, so they never overwrite existing NLP data.
+    Returns the rows written and failed and the number of statements issued. A
+    chunk that fails is rolled back on its own and its rows are retried next run.
+    """
+    table = Event.__table__
+    stmt = (
+        table.update()
+        .where(table.c.id == bindparam("_id"))
+        .values({
+            **{field: bindparam(f"_{field}") for field in NLP_UPDATE_FIELDS},
+            "nlp_status": STATUS_DONE,
+            "nlp_retry_after": None
+        })
+    )
+    stats = {"updated": 0, "failed": 0, "statements": 0}
+    chunk_size = max(1, chunk_size)
+    db = SessionLocal()
+    try:
+        for start in range(0, len(updates), chunk_size):
+            rows = [_nlp_row(event_id, nlp_data) for event_id, nlp_data in updates[start:start + chunk_size]]
+            try:
+                db.execute(stmt, rows)
+                db.commit()
+                stats["updated"] += len(rows)
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Error writing NLP data for {len(rows)} events: {e}")
+                stats["failed"] += len(rows)
+            stats["statements"] += 1
+        return stats
+    finally:
+        db.close()
+
+def event_nlp_text(event: Event) -> str:
+    # Combine event description and location for processing
+    return f"{event.description or ''} {event.location or ''}"
+
+async def process_single_event(event: Event, event_type: Optional[str] = None, entities: Optional[List[dict]] = None) -> bool:
     """Process a single event with NLP agent."""
     try:
-        # Combine event description and location for processing
-        text_to_process = f"{event.description or ''} {event.location or ''}"
+        text_to_process = event_nlp_text(event)
         
         if not text_to_process.strip():
             logger.warning(f"Event {event.id} has no text to process")
             return False
         
         # Process the event text
-        nlp_data = await process_event_text(text_to_process, event.location or "")
+        nlp_data = await process_event_text(text_to_process, event.location or "", event_type, entities)
         
         # Update the event in database
         success = update_event_with_nlp_data(event.id, nlp_data)
@@ -174,14 +563,100 @@ async def process_single_event(event: Event) -> bool:
         logger.error(f"Error processing event {event.id}: {e}")
         return False
 
-async def batch_process_events() -> Dict:
-    """Process all unprocessed events in batch."""
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))], 3)
+
+async def batch_process_events(concurrency: int = NLP_BATCH_CONCURRENCY, write_chunk_size: int = NLP_WRITE_CHUNK_SIZE) -> Dict:
+    """Process unprocessed events in batch.
+
+    Work is fetched in keyset-paginated pages; within a page, chunks of
+    NLP_EVENT_BATCH_SIZE events are processed ``concurrency`` at a time and
+    their results are written back with bulk UPDATEs of up to
+    ``write_chunk_size`` rows. Failed events are scheduled for a retry.
+    """
     logger.info("Starting NLP batch processing...")
-    
-    # Get all unprocessed events
-    unprocessed_events = get_unprocessed_events()
-    
-    if not unprocessed_events:
+    started = time.perf_counter()
+
+    total_events = 0
+    failed_count = 0
+    cached_count = 0
+    chunk_count = 0
+    pending_updates: List[Tuple[int, Dict]] = []
+    write_stats = {"updated": 0, "failed": 0, "statements": 0, "processed": 0}
+    chunk_latencies: List[float] = []
+    loop = asyncio.get_event_loop()
+
+    async def flush(force: bool = False) -> None:
+        while pending_updates and (force or len(pending_updates) >= write_chunk_size):
+            rows = pending_updates[:write_chunk_size]
+            del pending_updates[:write_chunk_size]
+            # One write chunk per call, so it is either written in full or not at all
+            result = await loop.run_in_executor(None, bulk_update_events_with_nlp_data, rows, write_chunk_size)
+            for key in result:
+                write_stats[key] += result[key]
+            write_stats["processed"] += result["updated"]
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def process_chunk(chunk: List[Event]) -> Tuple[List[Tuple[int, Dict]], List[Event]]:
+        """Returns the (event id, NLP data) pairs of a chunk and the events that failed."""
+        async with semaphore:
+            chunk_started = time.perf_counter()
+            try:
+                results = await process_event_texts([event_nlp_text(event) for event in chunk], [event.location or "" for event in chunk], use_cache=False)
+                updates = [(event.id, nlp_data) for event, nlp_data in zip(chunk, results) if nlp_data.get("summary") != FALLBACK_SUMMARY]
+                return updates, [event for event, nlp_data in zip(chunk, results) if nlp_data.get("summary") == FALLBACK_SUMMARY]
+            except Exception as e:
+                logger.error(f"Failed to process NLP chunk of {len(chunk)} events: {e}")
+                return [], chunk
+            finally:
+                chunk_latencies.append(time.perf_counter() - chunk_started)
+
+    # Page fetches and cache lookups are blocking DB calls, so they run in the executor like the writes
+    pages = iter_unprocessed_event_chunks()
+    while True:
+        page = await loop.run_in_executor(None, next, pages, None)
+        if page is None:
+            break
+        total_events += len(page)
+        logger.info(f"Found {len(page)} unprocessed events ({total_events} so far)")
+        failed_events: List[Event] = []
+
+        # Events whose content was already analysed under this pipeline version need no model calls
+        keys = [content_hash(event_nlp_text(event), event.location or "") for event in page]
+        cached = await loop.run_in_executor(None, get_cached_results, keys)
+        remaining = []
+        for event, key in zip(page, keys):
+            if key in cached:
+                pending_updates.append((event.id, cached[key]))
+                cached_count += 1
+            elif not event_nlp_text(event).strip():
+                logger.warning(f"Event {event.id} has no text to process")
+                failed_events.append(event)
+            else:
+                remaining.append(event)
+        await flush()
+
+        tasks = [
+            asyncio.ensure_future(process_chunk(remaining[start:start + NLP_EVENT_BATCH_SIZE]))
+            for start in range(0, len(remaining), NLP_EVENT_BATCH_SIZE)
+        ]
+        chunk_count += len(tasks)
+        for task in asyncio.as_completed(tasks):
+            updates, chunk_failed = await task
+            failed_events.extend(chunk_failed)
+            pending_updates.extend(updates)
+            await flush()
+        await flush(force=True)
+        if failed_events:
+            await loop.run_in_executor(None, mark_events_failed, "nlp", failed_events)
+            failed_count += len(failed_events)
+    await loop.run_in_executor(None, flush_hits)
+
+    if not total_events:
         logger.info("No unprocessed events found")
         return {
             "status": "success",
@@ -189,30 +664,27 @@ async def batch_process_events() -> Dict:
             "processed_count": 0,
             "total_events": 0
         }
-    
-    logger.info(f"Found {len(unprocessed_events)} unprocessed events")
-    
-    processed_count = 0
-    failed_count = 0
-    
-    # Process each event
-    for event in unprocessed_events:
-        try:
-            success = await process_single_event(event)
-            if success:
-                processed_count += 1
-            else:
-                failed_count += 1
-        except Exception as e:
-            logger.error(f"Failed to process event {event.id}: {e}")
-            failed_count += 1
-    
-    logger.info(f"NLP batch processing completed. Processed: {processed_count}, Failed: {failed_count}")
-    
+
+    processed_count = write_stats["processed"]
+    failed_count += write_stats["failed"]
+    elapsed = time.perf_counter() - started
+    logger.info(f"NLP batch processing completed in {elapsed:.1f}s. Processed: {processed_count} ({cached_count} from cache), Failed: {failed_count}")
+
     return {
         "status": "success",
         "message": f"Processed {processed_count} events successfully",
         "processed_count": processed_count,
         "failed_count": failed_count,
-        "total_events": len(unprocessed_events)
-    }
\ No newline at end of file
+        "cached_count": cached_count,
+        "total_events": total_events,
+        "stats": {
+            "elapsed_seconds": round(elapsed, 3),
+            "events_per_second": round(processed_count / elapsed, 2) if elapsed > 0 else None,
+            "chunks": chunk_count,
+            "concurrency": max(1, concurrency),
+            "chunk_latency_avg_seconds": round(sum(chunk_latencies) / len(chunk_latencies), 3) if chunk_latencies else None,
+            "chunk_latency_p95_seconds": _percentile(chunk_latencies, 0.95),
+            "chunk_latency_max_seconds": round(max(chunk_latencies), 3) if chunk_latencies else None,
+            "write_statements": write_stats["statements"]
+        }
+    }
@@ -0,0 +1,144 @@
+import os
+import logging
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import bindparam, func
+from sqlalchemy.exc import IntegrityError
+from db.database import SessionLocal
+from db.models import NLPResult
+from agents.single_flight import normalize_key
+from agents.llm_gateway import LLM_MODEL_NAME
+from agents.classifier_backends import NLP_CLASSIFIER_BACKEND, NLP_CLASSIFIER_MODEL
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Bump NLP_PIPELINE_REVISION when the prompt or post-processing changes; model and backend changes
+# are picked up automatically. Results from another version are purged and events reprocessed
+NLP_PIPELINE_REVISION = os.getenv("NLP_PIPELINE_REVISION", "1")
+NLP_PIPELINE_VERSION = os.getenv(
+    "NLP_PIPELINE_VERSION",
+    f"r{NLP_PIPELINE_REVISION}:{LLM_MODEL_NAME}:{NLP_CLASSIFIER_BACKEND}:{NLP_CLASSIFIER_MODEL.split('/')[-1]}"
+)[:100]
+NLP_RESULT_CACHE = os.getenv("NLP_RESULT_CACHE", "true").lower() in ["1", "true", "yes"]
+NLP_CACHE_HIT_FLUSH_SIZE = int(os.getenv("NLP_CACHE_HIT_FLUSH_SIZE", "100"))  # buffered hits before they are written
+
+RESULT_FIELDS = ("summary", "tags", "sentiment", "event_type", "entities")
+
+_pending_hits: Counter = Counter()
+_hits_lock = threading.Lock()
+
+
+def content_hash(text: str, location: str = "", version: str = NLP_PIPELINE_VERSION) -> str:
+    """Key for an NLP result: normalized text and location under one pipeline version."""
+    return normalize_key(version, text, location)
+
+def _as_result(row: NLPResult) -> Dict:
+    return {field: getattr(row, field) for field in RESULT_FIELDS}
+
+def get_cached_results(keys: List[str]) -> Dict[str, Dict]:
+    """Look up many content hashes at once; returns {hash: result} for the hits."""
+    keys = list(dict.fromkeys(keys))
+    if not NLP_RESULT_CACHE or not keys:
+        return {}
+    db = SessionLocal()
+    try:
+        rows = db.query(NLPResult).filter(NLPResult.content_hash.in_(keys)).all()
+        results = {row.content_hash: _as_result(row) for row in rows}
+    except Exception as e:
+        logger.warning(f"NLP result cache lookup failed: {e}")
+        return {}
+    finally:
+        db.close()
+    record_hits(list(results))
+    return results
+
+def record_hits(keys: List[str]) -> None:
+    """Count cache hits in memory; they are written in one batch once enough have built up."""
+    with _hits_lock:
+        _pending_hits.update(keys)
+        pending = sum(_pending_hits.values())
+    if pending >= NLP_CACHE_HIT_FLUSH_SIZE:
+        flush_hits()
+
+def flush_hits() -> int:
+    """Add the buffered hit counts to nlp_results. Best effort: a failed write drops the counts."""
+    with _hits_lock:
+        counts = dict(_pending_hits)
+        _pending_hits.clear()
+    if not counts:
+        return 0
+    table = NLPResult.__table__
+    db = SessionLocal()
+    try:
+        db.execute(
+            table.update()
+            .where(table.c.content_hash == bindparam("_hash"))
+            .values(hits=func.coalesce(table.c.hits, 0) + bindparam("_hits"), last_used_at=bindparam("_used")),
+            [{"_hash": key, "_hits": count, "_used": datetime.utcnow()} for key, count in counts.items()]
+        )
+        db.commit()
+        return len(counts)
+    except Exception as e:
+        logger.warning(f"Could not record {sum(counts.values())} NLP cache hits: {e}")
+        db.rollback()
+        return 0
+    finally:
+        db.close()
+
+def get_cached_result(key: str) -> Optional[Dict]:
+    return get_cached_results([key]).get(key)
+
+def store_result(key: str, result: Dict, version: str = NLP_PIPELINE_VERSION) -> bool:
+    """Save a result under its content hash; a concurrent insert of the same hash is not an error."""
+    if not NLP_RESULT_CACHE:
+        return False
+    db = SessionLocal()
+    try:
+        db.add(NLPResult(content_hash=key, pipeline_version=version, **{field: result.get(field) for field in RESULT_FIELDS}))
+        db.commit()
+        return True
+    except IntegrityError:
+        db.rollback()
+        return False
+    except Exception as e:
+        logger.warning(f"Could not store NLP result: {e}")
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+def purge_old_results(version: str = NLP_PIPELINE_VERSION) -> int:
+    """Delete cached results from other pipeline versions; the version is part of the key, so they can never be hit."""
+    db = SessionLocal()
+    try:
+        count = db.query(NLPResult).filter(NLPResult.pipeline_version != version).delete(synchronize_session=False)
+        db.commit()
+        if count:
+            logger.info(f"Purged {count} NLP results from pipeline versions other than {version}")
+        return count
+    except Exception as e:
+        logger.error(f"Error purging old NLP results: {e}")
+        db.rollback()
+        return 0
+    finally:
+        db.close()
+
+def get_cache_stats() -> Dict:
+    db = SessionLocal()
+    try:
+        total, hits = db.query(func.count(NLPResult.id), func.coalesce(func.sum(NLPResult.hits), 0)).one()
+        old = db.query(func.count(NLPResult.id)).filter(NLPResult.pipeline_version != NLP_PIPELINE_VERSION).scalar()
+        with _hits_lock:
+            pending = sum(_pending_hits.values())
+        return {
+            "pipeline_version": NLP_PIPELINE_VERSION,
+            "enabled": NLP_RESULT_CACHE,
+            "results": total,
+            "old_version_results": old,
+            "hits": int(hits) + pending
+        }
+    finally:
+        db.close()
@@ -4,6 +4,7 @@ from router.nlp_agent_r import router as nlp_router
 from router.rec_agent_r import router as recommender_router
 from router.location_agent_r import router as location_router
 from router.analysis_agent_r import router as analysis_router
+from router.worker_r import router as worker_router
 
 # Create a router for the orchestrator
 router = APIRouter()
@@ -18,3 +19,4 @@ router.include_router(location_router, prefix="/location")
 
 router.include_router(analysis_router, prefix="/analytics")
 
+router.include_router(worker_router, prefix="/worker")
@@ -0,0 +1,92 @@
+import os
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+from db.database import SessionLocal
+from db.models import CollectionQueryStat
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Scheduling settings
+SCHEDULER_RUN_BUDGET = int(os.getenv("SCHEDULER_RUN_BUDGET", "20"))  # max LLM search calls per collection
+SCHEDULER_BASE_INTERVAL_HOURS = float(os.getenv("SCHEDULER_BASE_INTERVAL_HOURS", "6"))
+SCHEDULER_MIN_INTERVAL_HOURS = float(os.getenv("SCHEDULER_MIN_INTERVAL_HOURS", "1"))
+SCHEDULER_MAX_INTERVAL_HOURS = float(os.getenv("SCHEDULER_MAX_INTERVAL_HOURS", str(7 * 24)))
+SCHEDULER_PRODUCTIVE_THRESHOLD = int(os.getenv("SCHEDULER_PRODUCTIVE_THRESHOLD", "3"))  # new events that count as productive
+
+
+def next_interval_hours(new_events: int, empty_streak: int) -> float:
+    """Back off exponentially while a query finds nothing new, and come back sooner when it is productive."""
+    if new_events == 0:
+        hours = SCHEDULER_BASE_INTERVAL_HOURS * (2 ** empty_streak)
+    elif new_events >= SCHEDULER_PRODUCTIVE_THRESHOLD:
+        hours = SCHEDULER_BASE_INTERVAL_HOURS / 2
+    else:
+        hours = SCHEDULER_BASE_INTERVAL_HOURS
+    return min(max(hours, SCHEDULER_MIN_INTERVAL_HOURS), SCHEDULER_MAX_INTERVAL_HOURS)
+
+def select_due_queries(pairs: List[Tuple[str, str]], budget: int = SCHEDULER_RUN_BUDGET) -> List[Tuple[str, str]]:
+    """Pick the (provider, query) pairs to run this collection.
+
+    Pairs that have never run come first, then due pairs ordered by how many new
+    events they found per run, then by how long ago they last ran. At most
+    `budget` pairs are returned.
+    """
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        stats = {(s.provider, s.query): s for s in db.query(CollectionQueryStat).all()}
+    except Exception as e:
+        logger.error(f"[Scheduler] Failed to load query stats, running all queries: {e}")
+        return pairs[:budget] if budget > 0 else pairs
+    finally:
+        db.close()
+
+    due = []
+    for provider, query in pairs:
+        stat = stats.get((provider, query))
+        if stat is None or stat.last_run_at is None:
+            due.append(((0, 0.0, 0.0), (provider, query)))
+        elif stat.next_run_at is None or stat.next_run_at <= now:
+            yield_per_run = (stat.total_new or 0) / max(stat.total_runs or 1, 1)
+            due.append(((1, -yield_per_run, stat.last_run_at.timestamp()), (provider, query)))
+
+    due.sort(key=lambda item: item[0])
+    selected = [pair for _, pair in due]
+    if budget > 0:
+        selected = selected[:budget]
+    logger.info(f"[Scheduler] {len(due)} of {len(pairs)} queries due, running {len(selected)}")
+    return selected
+
+def record_query_results(query_stats: List[Dict]) -> None:
+    """Store the outcome of each query run and schedule its next run."""
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        for result in query_stats:
+            # Timeouts and errors say nothing about the query's yield, so retry them on the normal schedule
+            succeeded = result.get("status") == "ok"
+            stat = db.query(CollectionQueryStat).filter(
+                CollectionQueryStat.provider == result["provider"],
+                CollectionQueryStat.query == result["query"]
+            ).first()
+            if stat is None:
+                stat = CollectionQueryStat(provider=result["provider"], query=result["query"], empty_streak=0, total_runs=0, total_new=0)
+                db.add(stat)
+
+            new_events = result.get("new_events", 0)
+            stat.last_run_at = now
+            stat.last_returned = result.get("events", 0)
+            stat.last_new = new_events
+            if succeeded:
+                stat.total_runs = (stat.total_runs or 0) + 1
+                stat.total_new = (stat.total_new or 0) + new_events
+                stat.empty_streak = (stat.empty_streak or 0) + 1 if new_events == 0 else 0
+            stat.next_run_at = now + timedelta(hours=next_interval_hours(new_events if succeeded else 1, stat.empty_streak or 0))
+        db.commit()
+    except Exception as e:
+        logger.error(f"[Scheduler] Failed to record query results: {e}")
+        db.rollback()
+    finally:
+        db.close()
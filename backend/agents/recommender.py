@@ -1,14 +1,11 @@
-import os
-import json
 import re
-import google.generativeai as genai
 from typing import List, Dict
 from datetime import datetime, timedelta
 from db.database import SessionLocal
 from db.models import Event, User
+from agents.llm_json import generate_json_sync, EVENT_LIST_SCHEMA
 
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-model = genai.GenerativeModel("gemini-2.5-flash")
+LLM_AGENT_NAME = "recommender"
 
 def query_gemini(interests: List[str], sentiment: str) -> List[dict]:
     prompt = f"""
@@ -31,8 +28,10 @@ def query_gemini(interests: List[str], sentiment: str) -> List[dict]:
     """
 
     try:
-        response = model.generate_content(prompt)
-        return json.loads(response.text.strip("```"))
+        events, complete, _ = generate_json_sync(prompt, LLM_AGENT_NAME, EVENT_LIST_SCHEMA)
+        if not complete and not events:
+            raise ValueError("no events could be parsed from Gemini's response")
+        return [event for event in events if isinstance(event, dict)]
     except Exception as e:
         return [{
             "event_name": "Error",
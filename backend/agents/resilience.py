@@ -0,0 +1,216 @@
+import os
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Circuit breaker settings, shared by every external dependency
+BREAKER_WINDOW_SECONDS = float(os.getenv("BREAKER_WINDOW_SECONDS", "60"))
+BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "5"))
+BREAKER_FAILURE_RATE = float(os.getenv("BREAKER_FAILURE_RATE", "0.5"))
+BREAKER_OPEN_SECONDS = float(os.getenv("BREAKER_OPEN_SECONDS", "30"))
+BREAKER_HALF_OPEN_CALLS = int(os.getenv("BREAKER_HALF_OPEN_CALLS", "1"))
+
+# Hedged requests: dependencies listed here get a second attempt once the first is slower than their p95
+HEDGE_DEPENDENCIES = {d.strip() for d in os.getenv("HEDGE_DEPENDENCIES", "directions").split(",") if d.strip()}
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+HEDGE_DEFAULT_DELAY_SECONDS = float(os.getenv("HEDGE_DEFAULT_DELAY_SECONDS", "2.0"))
+HEDGE_MAX_WORKERS = int(os.getenv("HEDGE_MAX_WORKERS", "16"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} circuit is open; retry in {retry_in:.0f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class LatencyTracker:
+    """Rolling window of recent successful call latencies."""
+
+    def __init__(self, size: int = 200):
+        self.samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self.samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            if not self.samples:
+                return None
+            ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker over a sliding failure-rate window.
+
+    The circuit opens when at least ``min_calls`` outcomes in the last
+    ``window_seconds`` have a failure rate of ``failure_rate`` or more. After
+    ``open_seconds`` it lets ``half_open_calls`` trial calls through; one success
+    closes it again, one failure re-opens it.
+    """
+
+    def __init__(self, name: str, window_seconds: float = BREAKER_WINDOW_SECONDS, min_calls: int = BREAKER_MIN_CALLS,
+                 failure_rate: float = BREAKER_FAILURE_RATE, open_seconds: float = BREAKER_OPEN_SECONDS,
+                 half_open_calls: int = BREAKER_HALF_OPEN_CALLS):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = max(1, half_open_calls)
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.trial_calls = 0
+        self.outcomes = deque()  # (timestamp, succeeded)
+        self.rejected = 0
+        self.latency = LatencyTracker()
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float) -> None:
+        while self.outcomes and now - self.outcomes[0][0] > self.window_seconds:
+            self.outcomes.popleft()
+
+    def _open(self, now: float) -> None:
+        self.state = OPEN
+        self.opened_at = now
+        self.trial_calls = 0
+        logger.warning(f"[Breaker] {self.name} circuit opened for {self.open_seconds:.0f}s")
+
+    def allow(self) -> None:
+        """Reserve a call, raising CircuitOpenError when the dependency should not be called."""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == OPEN:
+                if now - self.opened_at < self.open_seconds:
+                    self.rejected += 1
+                    raise CircuitOpenError(self.name, self.open_seconds - (now - self.opened_at))
+                self.state = HALF_OPEN
+                self.trial_calls = 0
+                logger.info(f"[Breaker] {self.name} circuit half-open, sending a trial call")
+            if self.state == HALF_OPEN:
+                if self.trial_calls >= self.half_open_calls:
+                    self.rejected += 1
+                    raise CircuitOpenError(self.name, 0)
+                self.trial_calls += 1
+
+    def record_success(self, latency: Optional[float] = None) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if self.state == HALF_OPEN:
+                self.state = CLOSED
+                self.outcomes.clear()
+                logger.info(f"[Breaker] {self.name} circuit closed")
+            self.outcomes.append((now, True))
+            self._trim(now)
+        if latency is not None:
+            self.latency.add(latency)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if self.state == HALF_OPEN:
+                self._open(now)
+                return
+            self.outcomes.append((now, False))
+            self._trim(now)
+            failures = sum(1 for _, ok in self.outcomes if not ok)
+            if self.state == CLOSED and len(self.outcomes) >= self.min_calls and failures / len(self.outcomes) >= self.failure_rate:
+                self._open(now)
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Call ``fn`` through the breaker; any exception it raises counts as a failure."""
+        self.allow()
+        started = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success(time.perf_counter() - started)
+        return result
+
+    def stats(self) -> Dict:
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            failures = sum(1 for _, ok in self.outcomes if not ok)
+            return {
+                "state": self.state,
+                "window_calls": len(self.outcomes),
+                "window_failures": failures,
+                "rejected": self.rejected,
+                "p95_latency_seconds": self.latency.percentile(0.95)
+            }
+
+
+_hedge_executor = ThreadPoolExecutor(max_workers=max(2, HEDGE_MAX_WORKERS), thread_name_prefix="hedge")
+
+def hedge_delay(breaker: CircuitBreaker) -> float:
+    if len(breaker.latency.samples) < HEDGE_MIN_SAMPLES:
+        return HEDGE_DEFAULT_DELAY_SECONDS
+    return breaker.latency.percentile(0.95)
+
+def call_with_breaker(name: str, fn: Callable[..., Any], *args, hedge: Optional[bool] = None, **kwargs) -> Any:
+    """Call a dependency through its breaker, hedging idempotent reads when enabled.
+
+    A hedged call starts a second attempt if the first has not finished within
+    the dependency's p95 latency and returns whichever finishes first
+    successfully. Only use it for reads that are safe to repeat.
+    """
+    breaker = get_breaker(name)
+    if hedge is None:
+        hedge = name in HEDGE_DEPENDENCIES
+    if not hedge:
+        return breaker.call(fn, *args, **kwargs)
+
+    breaker.allow()
+    started = time.perf_counter()
+    pending = {_hedge_executor.submit(fn, *args, **kwargs)}
+    done, pending = wait(pending, timeout=hedge_delay(breaker))
+    if not done:
+        logger.info(f"[Breaker] {name} slower than p95, sending a hedged request")
+        pending.add(_hedge_executor.submit(fn, *args, **kwargs))
+
+    error = None
+    while done or pending:
+        for future in done:
+            if future.exception() is None:
+                breaker.record_success(time.perf_counter() - started)
+                # The slower attempt finishes in the background and is ignored
+                return future.result()
+            error = future.exception()
+        if not pending:
+            break
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+    breaker.record_failure()
+    raise error
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+def get_breaker(name: str) -> CircuitBreaker:
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name)
+        return _breakers[name]
+
+def get_breaker_stats() -> Dict[str, Dict]:
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.stats() for breaker in breakers}
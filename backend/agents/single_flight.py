@@ -0,0 +1,111 @@
+import re
+import asyncio
+import hashlib
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def normalize_key(*parts) -> str:
+    """Build a request identity that ignores case and whitespace differences."""
+    normalized = "\x1f".join(re.sub(r"\s+", " ", str(part if part is not None else "")).strip().lower() for part in parts)
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Collapse concurrent identical calls into one in-flight call.
+
+    The first caller for a key runs the function; callers arriving while it is
+    still running wait for it and receive the same result (or exception).
+    Nothing is cached once the call finishes. ``do`` serves blocking callers in
+    threads, ``run`` serves coroutines on an event loop.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._tasks: Dict[tuple, asyncio.Task] = {}
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                call.waiters += 1
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+            if call.waiters:
+                logger.info(f"[SingleFlight] {self.name}: {call.waiters} caller(s) shared one call")
+        return call.result
+
+    async def run(self, key: str, coro_fn: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        # Tasks belong to one event loop, so keys are scoped per loop
+        task_key = (id(loop), key)
+        with self._lock:
+            task = self._tasks.get(task_key)
+            if task is None or task.done():
+                task = loop.create_task(coro_fn())
+                self._tasks[task_key] = task
+                self.executed += 1
+
+                def _forget(finished, task_key=task_key):
+                    with self._lock:
+                        if self._tasks.get(task_key) is finished:
+                            del self._tasks[task_key]
+                task.add_done_callback(_forget)
+            else:
+                self.shared += 1
+                logger.info(f"[SingleFlight] {self.name}: attaching to in-flight call")
+        # shield() keeps one caller's cancellation (e.g. a dropped request) from cancelling the shared call
+        return await asyncio.shield(task)
+
+    def in_flight(self, key: str) -> bool:
+        with self._lock:
+            return key in self._calls or any(task_key[1] == key and not task.done() for task_key, task in self._tasks.items())
+
+    def stats(self) -> Dict[str, int]:
+        return {"executed": self.executed, "shared": self.shared}
+
+
+# Shared groups used across the agents
+llm_flight = SingleFlight("llm")
+geocode_flight = SingleFlight("geocode")
+agent_flight = SingleFlight("agents")
+
+
+async def run_agent_once(job_name: str, coro_fn: Callable[[], Awaitable[Any]]) -> Any:
+    """Run an agent job, or attach to the run already in progress in this process."""
+    return await agent_flight.run(job_name, coro_fn)
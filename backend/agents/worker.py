@@ -0,0 +1,245 @@
+"""Standalone agent worker.
+
+Runs the Event Collector, NLP and Location agents on cron-style schedules in
+their own process, so the API workers never do the heavy LLM/ML work:
+
+    python -m agents.worker                    # run forever on the configured schedules
+    python -m agents.worker --once collect_events
+"""
+import os
+import json
+import asyncio
+import logging
+import argparse
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from db.database import SessionLocal, Base, engine
+from db.models import AgentJobRun
+from agents.single_flight import run_agent_once
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Cron expressions (minute hour day-of-month month day-of-week); empty disables a job
+WORKER_COLLECT_CRON = os.getenv("WORKER_COLLECT_CRON", "0 */6 * * *")
+WORKER_NLP_CRON = os.getenv("WORKER_NLP_CRON", "20 * * * *")
+WORKER_LOCATION_CRON = os.getenv("WORKER_LOCATION_CRON", "40 * * * *")
+WORKER_NLP_CACHE_PURGE_CRON = os.getenv("WORKER_NLP_CACHE_PURGE_CRON", "50 3 * * *")
+WORKER_POLL_SECONDS = float(os.getenv("WORKER_POLL_SECONDS", "20"))
+
+
+def _parse_cron_field(field: str, low: int, high: int) -> Set[int]:
+    values = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+        if part in ["*", ""]:
+            start, end = low, high
+        elif "-" in part:
+            start_text, end_text = part.split("-", 1)
+            start, end = int(start_text), int(end_text)
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        if start < low or end > high or start > end or step < 1:
+            raise ValueError(f"Cron field '{field}' out of range {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """Minimal five-field cron expression matcher."""
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression '{expression}' must have 5 fields")
+        self.expression = expression
+        self.minutes = _parse_cron_field(fields[0], 0, 59)
+        self.hours = _parse_cron_field(fields[1], 0, 23)
+        self.days = _parse_cron_field(fields[2], 1, 31)
+        self.months = _parse_cron_field(fields[3], 1, 12)
+        # Both 0 and 7 mean Sunday
+        self.weekdays = {d % 7 for d in _parse_cron_field(fields[4], 0, 7)}
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    def matches(self, moment: datetime) -> bool:
+        if moment.minute not in self.minutes or moment.hour not in self.hours or moment.month not in self.months:
+            return False
+        day_match = moment.day in self.days
+        weekday_match = (moment.isoweekday() % 7) in self.weekdays
+        # Standard cron: when both day fields are restricted, either one may match
+        if self.any_day or self.any_weekday:
+            return day_match and weekday_match
+        return day_match or weekday_match
+
+
+async def _collect_events_job() -> Dict:
+    from agents.event_collector import collect_event
+    # NLP has its own schedule, so the collector does not chain into it here
+    return await run_agent_once("collect_events", lambda: collect_event(run_nlp=False))
+
+async def _nlp_job() -> Dict:
+    from agents.nlp_agent import batch_process_events
+    return await run_agent_once("nlp_processing", batch_process_events)
+
+async def _location_job() -> Dict:
+    from agents.location_agent import batch_process_event_locations
+    return await run_agent_once("location_processing", batch_process_event_locations)
+
+async def _nlp_cache_purge_job() -> Dict:
+    from agents.nlp_cache import purge_old_results, flush_hits
+    loop = asyncio.get_event_loop()
+    await loop.run_in_executor(None, flush_hits)
+    purged = await loop.run_in_executor(None, purge_old_results)
+    return {"status": "success", "purged_results": purged}
+
+WORKER_JOBS = {
+    "collect_events": (WORKER_COLLECT_CRON, _collect_events_job),
+    "nlp_processing": (WORKER_NLP_CRON, _nlp_job),
+    "location_processing": (WORKER_LOCATION_CRON, _location_job),
+    "nlp_cache_purge": (WORKER_NLP_CACHE_PURGE_CRON, _nlp_cache_purge_job),
+}
+
+
+def _start_job_run(job_name: str, triggered_by: str) -> Optional[int]:
+    db = SessionLocal()
+    try:
+        run = AgentJobRun(job_name=job_name, status="running", triggered_by=triggered_by, started_at=datetime.utcnow())
+        db.add(run)
+        db.commit()
+        return run.id
+    except Exception as e:
+        logger.error(f"[Worker] Failed to record start of {job_name}: {e}")
+        db.rollback()
+        return None
+    finally:
+        db.close()
+
+def _finish_job_run(run_id: Optional[int], status: str, result: Optional[Dict] = None, error: Optional[str] = None) -> None:
+    if run_id is None:
+        return
+    db = SessionLocal()
+    try:
+        run = db.query(AgentJobRun).filter(AgentJobRun.id == run_id).first()
+        if not run:
+            return
+        run.status = status
+        run.finished_at = datetime.utcnow()
+        run.duration_seconds = int((run.finished_at - run.started_at).total_seconds())
+        # Round-trip through JSON so datetimes in agent results are stored as strings
+        run.result = json.loads(json.dumps(result, default=str)) if result is not None else None
+        run.error = error
+        db.commit()
+    except Exception as e:
+        logger.error(f"[Worker] Failed to record result of run {run_id}: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+async def run_recorded_job(job_name: str, triggered_by: str = "worker") -> Dict:
+    """Run one agent job, persisting its status and result to agent_job_runs."""
+    _, job_fn = WORKER_JOBS[job_name]
+    loop = asyncio.get_event_loop()
+    run_id = await loop.run_in_executor(None, _start_job_run, job_name, triggered_by)
+    logger.info(f"[Worker] Starting {job_name} (run {run_id})")
+    try:
+        result = await job_fn()
+    except Exception as e:
+        logger.error(f"[Worker] {job_name} failed: {e}")
+        # Only the exception type is recorded; the full message stays in the log
+        await loop.run_in_executor(None, _finish_job_run, run_id, "failed", None, type(e).__name__)
+        return {"status": "error", "job": job_name, "run_id": run_id, "message": str(e)}
+
+    status = "failed" if isinstance(result, dict) and result.get("status") == "error" else "success"
+    await loop.run_in_executor(None, _finish_job_run, run_id, status, result, None)
+    logger.info(f"[Worker] Finished {job_name} (run {run_id}): {status}")
+    return {"status": status, "job": job_name, "run_id": run_id, "result": result}
+
+def get_job_status(history: int = 5) -> Dict:
+    """Latest runs of every worker job, for the status endpoint."""
+    db = SessionLocal()
+    try:
+        jobs = {}
+        for job_name, (cron, _) in WORKER_JOBS.items():
+            runs = db.query(AgentJobRun).filter(AgentJobRun.job_name == job_name).order_by(AgentJobRun.id.desc()).limit(history).all()
+            jobs[job_name] = {
+                "schedule": cron or None,
+                "running": any(run.status == "running" for run in runs),
+                "runs": [
+                    {
+                        "run_id": run.id,
+                        "status": run.status,
+                        "triggered_by": run.triggered_by,
+                        "started_at": run.started_at.isoformat() if run.started_at else None,
+                        "finished_at": run.finished_at.isoformat() if run.finished_at else None,
+                        "duration_seconds": run.duration_seconds,
+                        "error": (run.error or "").split(":", 1)[0][:100] or None
+                    }
+                    for run in runs
+                ]
+            }
+        return {"status": "success", "jobs": jobs}
+    finally:
+        db.close()
+
+
+async def run_worker(job_names: Optional[List[str]] = None) -> None:
+    """Fire each scheduled job when its cron expression matches, never overlapping a job with itself."""
+    schedules = {}
+    for job_name, (cron, _) in WORKER_JOBS.items():
+        if job_names and job_name not in job_names:
+            continue
+        if cron.strip():
+            schedules[job_name] = CronSchedule(cron)
+    if not schedules:
+        logger.warning("[Worker] No jobs scheduled; check the WORKER_*_CRON settings")
+        return
+
+    for job_name, schedule in schedules.items():
+        logger.info(f"[Worker] {job_name} scheduled at '{schedule.expression}'")
+
+    running: Dict[str, asyncio.Task] = {}
+    last_minute = None
+    while True:
+        minute = datetime.now().replace(second=0, microsecond=0)
+        if minute != last_minute:
+            last_minute = minute
+            for job_name, schedule in schedules.items():
+                if not schedule.matches(minute):
+                    continue
+                if job_name in running and not running[job_name].done():
+                    logger.warning(f"[Worker] Skipping {job_name}: previous run still in progress")
+                    continue
+                running[job_name] = asyncio.create_task(run_recorded_job(job_name))
+        await asyncio.sleep(WORKER_POLL_SECONDS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EventCulture agent worker")
+    parser.add_argument("--once", choices=list(WORKER_JOBS), help="run a single job now and exit")
+    parser.add_argument("--jobs", nargs="*", choices=list(WORKER_JOBS), help="only schedule these jobs")
+    args = parser.parse_args()
+
+    # Ensure tables exist without dropping existing data
+    try:
+        Base.metadata.create_all(bind=engine)
+    except Exception:
+        pass
+
+    if args.once:
+        result = asyncio.run(run_recorded_job(args.once, triggered_by="manual"))
+        print(json.dumps(result, default=str, indent=2))
+    else:
+        asyncio.run(run_worker(args.jobs))
+
+
+if __name__ == "__main__":
+    main()
@@ -298,7 +298,8 @@ async def trigger_event_collection_manually(request: Request, current_user: dict
     """Manually trigger event collection"""
     try:
         from agents.event_collector import collect_event
-        result = await collect_event()
+        from agents.single_flight import run_agent_once
+        result = await run_agent_once("collect_events", collect_event)
         return JSONResponse({
             "status": "success",
             "message": "Event collection completed",
@@ -1,9 +1,14 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Index, UniqueConstraint
 from datetime import datetime
 from .database import Base
 
 class Event(Base):
     __tablename__ = "events"
+    # Agents fetch work by status in primary-key order
+    __table_args__ = (
+        Index("ix_events_nlp_status_id", "nlp_status", "id"),
+        Index("ix_events_location_status_id", "location_status", "id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     event_name = Column(String(255), nullable=False)
     location = Column(String(255))
@@ -18,6 +23,86 @@ class Event(Base):
     entities = Column(JSON)
     views = Column(Integer, default=0)
     clicks = Column(Integer, default=0)
+    natural_key = Column(String(64), unique=True, index=True, nullable=True)  # sha256 of name, location and date
+    fingerprint = Column(String(40), index=True, nullable=True)  # sha1 of normalized name, venue and day
+    nlp_version = Column(String(100), index=True, nullable=True)  # NLP pipeline version that produced summary, tags and event_type
+    nlp_status = Column(String(20), default="pending", server_default="pending")  # "pending", "done", "failed"
+    nlp_attempts = Column(Integer, default=0, server_default="0")
+    nlp_retry_after = Column(DateTime, nullable=True)  # failed rows are retried from this time; NULL gives up
+    location_status = Column(String(20), default="pending", server_default="pending")  # "pending", "done", "failed"
+    location_attempts = Column(Integer, default=0, server_default="0")
+    location_retry_after = Column(DateTime, nullable=True)
+
+
+class EventArchive(Base):
+    __tablename__ = "events_archive"
+    id = Column(Integer, primary_key=True, autoincrement=False)  # id of the archived Event
+    event_name = Column(String(255), nullable=False)
+    location = Column(String(255))
+    date = Column(DateTime, index=True)
+    description = Column(Text)
+    booking_url = Column(String(500))
+    source = Column(String(100))
+    tags = Column(JSON)
+    summary = Column(Text, nullable=True)
+    event_type = Column(String(100), nullable=True)
+    sentiment = Column(String(50), nullable=True)
+    entities = Column(JSON)
+    views = Column(Integer, default=0)
+    clicks = Column(Integer, default=0)
+    natural_key = Column(String(64), index=True, nullable=True)
+    fingerprint = Column(String(40), index=True, nullable=True)
+    nlp_version = Column(String(100), nullable=True)
+    nlp_status = Column(String(20), nullable=True)
+    nlp_attempts = Column(Integer, nullable=True)
+    nlp_retry_after = Column(DateTime, nullable=True)
+    location_status = Column(String(20), nullable=True)
+    location_attempts = Column(Integer, nullable=True)
+    location_retry_after = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+
+class CollectionQueryStat(Base):
+    __tablename__ = "collection_query_stats"
+    __table_args__ = (UniqueConstraint("query", "provider", name="uq_collection_query_provider"),)
+    id = Column(Integer, primary_key=True, index=True)
+    query = Column(String(255), nullable=False)
+    provider = Column(String(100), nullable=False)
+    last_run_at = Column(DateTime, nullable=True)
+    next_run_at = Column(DateTime, nullable=True, index=True)
+    last_returned = Column(Integer, default=0)  # events returned by the last run
+    last_new = Column(Integer, default=0)  # events that were new after dedup
+    empty_streak = Column(Integer, default=0)  # consecutive runs without new events
+    total_runs = Column(Integer, default=0)
+    total_new = Column(Integer, default=0)
+
+
+class NLPResult(Base):
+    __tablename__ = "nlp_results"
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String(64), unique=True, index=True, nullable=False)  # sha256 of normalized text, location and pipeline version
+    pipeline_version = Column(String(100), index=True, nullable=False)
+    summary = Column(Text, nullable=True)
+    tags = Column(JSON)
+    sentiment = Column(String(50), nullable=True)
+    event_type = Column(String(100), nullable=True)
+    entities = Column(JSON)
+    hits = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, nullable=True)
+
+
+class AgentJobRun(Base):
+    __tablename__ = "agent_job_runs"
+    id = Column(Integer, primary_key=True, index=True)
+    job_name = Column(String(100), nullable=False, index=True)
+    status = Column(String(20), nullable=False, default="running")  # "running", "success", "failed"
+    triggered_by = Column(String(50), default="worker")  # "worker", "api", "manual"
+    started_at = Column(DateTime, default=datetime.utcnow, index=True)
+    finished_at = Column(DateTime, nullable=True)
+    duration_seconds = Column(Integer, nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
 
 
 class User(Base):
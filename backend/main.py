@@ -13,6 +13,7 @@ from fastapi.responses import HTMLResponse
 from auth.google_auth import router as google_auth_router
 
 from agents.orchestrator import router as orchestrator_router  
+from agents.single_flight import run_agent_once
 from db.database import Base, engine
 
 load_dotenv()
@@ -70,9 +71,16 @@ async def startup_event():
     print("EventCulture Multi-AI-Agent System Starting...")
     print("=" * 60)
     
-    # Ask user if they want to run the agents
+    # "prompt" asks on an interactive terminal, "run" always runs, "skip" leaves it to the worker
+    startup_mode = os.getenv("AGENTS_ON_STARTUP", "prompt").lower()
+    if startup_mode == "prompt" and not sys.stdin.isatty():
+        startup_mode = "skip"
+
     try:
-        response = input("\nDo you want to run Event Collector and NLP agents? (y/n): ").strip().lower()
+        if startup_mode == "prompt":
+            response = input("\nDo you want to run Event Collector and NLP agents? (y/n): ").strip().lower()
+        else:
+            response = "y" if startup_mode == "run" else "n"
         
         if response in ['y', 'yes']:
             print("\nRunning Event Collector and NLP agents...")
@@ -82,10 +90,16 @@ async def startup_event():
             asyncio.create_task(run_agents_on_startup())
         else:
             print("\n Skipping agent execution. Server will start with existing database records.")
-            print(" You can manually trigger agents later if needed.")
+            print(" Run 'python -m agents.worker' to process agents on a schedule.")
     except (EOFError, KeyboardInterrupt):
         print("\n  Skipping agent execution. Server will start with existing database records.")
     
+    # NLP models load on first use; optionally start loading them now without blocking startup
+    from agents.nlp_agent import NLP_WARMUP_ON_STARTUP, start_background_warmup
+    if NLP_WARMUP_ON_STARTUP:
+        start_background_warmup()
+        print(" Warming up NLP models in the background (see /api/nlp/ready)")
+
     print("\n Server is ready to accept requests!")
     print("=" * 60)
 
@@ -97,15 +111,15 @@ async def run_agents_on_startup():
         from agents.location_agent import batch_process_event_locations
         
         print(" Starting Event Collector agent...")
-        result = await collect_event()
+        result = await run_agent_once("collect_events", collect_event)
         print(f"Event collection completed: {result.get('events_collected', 0)} events collected")
         
         print(" Starting NLP agent for post-processing...")
-        nlp_result = await batch_process_events()
+        nlp_result = await run_agent_once("nlp_processing", batch_process_events)
         print(f" NLP processing completed: {nlp_result.get('processed_count', 0)} events processed")
         
         print(" Starting Location agent for location processing...")
-        location_result = await batch_process_event_locations()
+        location_result = await run_agent_once("location_processing", batch_process_event_locations)
         print(f" Location processing completed: {location_result.get('processed_count', 0)} events processed")
         
         print(" All agents completed successfully!")
@@ -214,15 +228,15 @@ async def trigger_agents_manually():
         
         # Run Event Collector
         print(" Manually triggering Event Collector agent...")
-        event_result = await collect_event()
+        event_result = await run_agent_once("collect_events", collect_event)
         
         # Run NLP Agent
         print(" Manually triggering NLP agent...")
-        nlp_result = await batch_process_events()
+        nlp_result = await run_agent_once("nlp_processing", batch_process_events)
         
         # Run Location Agent
         print(" Manually triggering Location agent...")
-        location_result = await batch_process_event_locations()
+        location_result = await run_agent_once("location_processing", batch_process_event_locations)
         
         return {
             "status": "success",
@@ -242,7 +256,7 @@ async def trigger_event_collection_manually():
     """Manually trigger event collection only"""
     try:
         from agents.event_collector import collect_event
-        result = await collect_event()
+        result = await run_agent_once("collect_events", collect_event)
         return {
             "status": "success",
             "message": "Event collection completed",
@@ -259,7 +273,7 @@ async def trigger_nlp_processing_manually():
     """Manually trigger NLP processing only"""
     try:
         from agents.nlp_agent import batch_process_events
-        result = await batch_process_events()
+        result = await run_agent_once("nlp_processing", batch_process_events)
         return {
             "status": "success",
             "message": "NLP processing completed",
@@ -276,7 +290,7 @@ async def trigger_location_processing_manually():
     """Manually trigger location processing only"""
     try:
         from agents.location_agent import batch_process_event_locations
-        result = await batch_process_event_locations()
+        result = await run_agent_once("location_processing", batch_process_event_locations)
         return {
             "status": "success",
             "message": "Location processing completed",
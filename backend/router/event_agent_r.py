@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Request, Depends, HTTPException
 from schema.event_agent_s import EventCreate, EventOut
-from agents.event_collector import insert_single_event, collect_event
+from agents.event_collector import insert_single_event, collect_event, upsert_events_to_db
 from db.database import SessionLocal
 from db.models import Event
 from typing import List
 from auth.google_auth import get_current_user
+from agents.single_flight import run_agent_once
 from fastapi.responses import PlainTextResponse
 
 router = APIRouter()
@@ -16,6 +17,15 @@ def create_event(event: EventCreate, current_user: dict = Depends(get_current_us
     saved_event = insert_single_event(event_dict)
     return saved_event
 
+@router.post("/events/bulk/")
+def bulk_import_events(events: List[EventCreate], current_user: dict = Depends(get_current_user)):
+    """Insert or update many events in a few bulk statements (requires authentication)"""
+    try:
+        event_ids = upsert_events_to_db([event.dict() for event in events])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to import events: {str(e)}")
+    return {"status": "success", "count": len(event_ids), "event_ids": event_ids}
+
 @router.get("/events/", response_model=List[EventOut])
 def list_events(current_user: dict = Depends(get_current_user)):
     """List all events (requires authentication)"""
@@ -99,8 +109,11 @@ def get_event_public(event_id: int):
 
 @router.post("/collect-events/")
 async def collect_events(current_user: dict = Depends(get_current_user)):
-    """Collect events from all sources and store in database (requires authentication)"""
-    return await collect_event()
+    """Collect events from all sources and store in database (requires authentication).
+
+    A request made while a collection is already running waits for that run's result.
+    """
+    return await run_agent_once("collect_events", collect_event)
 
 @router.post("/events/{event_id}/view")
 def track_view(event_id: int, current_user: dict = Depends(get_current_user)):
@@ -12,6 +12,7 @@ from agents.location_agent import (
 )
 from schema.location_agent_s import LocationResponse, OpenLayersLocationResponse
 from auth.google_auth import get_current_user  
+from agents.single_flight import run_agent_once
 import os
 
 router = APIRouter()
@@ -151,7 +152,7 @@ async def process_event_locations(current_user: dict = Depends(get_current_user)
         )
     
     try:
-        result = await batch_process_event_locations()
+        result = await run_agent_once("location_processing", batch_process_event_locations)
         return result
     except Exception as e:
         raise HTTPException(
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.orm import Session
 from typing import List
 import asyncio
@@ -7,8 +7,14 @@ import json
 from schema.nlp_agent_s import RawEvent, EnhancedEvent
 from db.database import SessionLocal
 from db.models import Event
-from agents.nlp_agent import process_event_text, batch_process_events, get_unprocessed_events
+from agents.nlp_agent import (
+    process_event_text, batch_process_events, get_unprocessed_events, get_model_status, start_background_warmup,
+    FALLBACK_SUMMARY, NLP_INFERENCE_URL, NLP_WARMUP_ON_STARTUP
+)
+from agents.nlp_cache import NLP_PIPELINE_VERSION, get_cache_stats
+from agents.event_work import STATUS_DONE, count_pending_events, get_status_counts
 from auth.google_auth import get_current_user
+from agents.single_flight import run_agent_once
 
 router = APIRouter()
 
@@ -26,12 +32,16 @@ async def enhance_event(raw: RawEvent, current_user: dict = Depends(get_current_
                 sentiment="neutral"
             )
         result = await process_event_text(event.description, event.location or "")
-        event.summary = result["summary"]
-        event.tags = result["tags"]  # Store as list (update DB model)
-        event.event_type = result["event_type"]
-        event.sentiment = result["sentiment"]
-        event.entities = result["entities"]
-        db.commit()
+        # Keep the stored NLP data when Gemini only produced the placeholder
+        if result["summary"] != FALLBACK_SUMMARY:
+            event.summary = result["summary"]
+            event.tags = result["tags"]  # Store as list (update DB model)
+            event.event_type = result["event_type"]
+            event.sentiment = result["sentiment"]
+            event.entities = result["entities"]
+            event.nlp_version = NLP_PIPELINE_VERSION
+            event.nlp_status = STATUS_DONE
+            db.commit()
         return EnhancedEvent(**result)
     finally:
         db.close()
@@ -40,7 +50,7 @@ async def enhance_event(raw: RawEvent, current_user: dict = Depends(get_current_
 async def batch_enhance_events(current_user: dict = Depends(get_current_user)):
     """Process all unprocessed events in batch (post-processing after Event Collector)."""
     try:
-        result = await batch_process_events()
+        result = await run_agent_once("nlp_processing", batch_process_events)
         return result
     except Exception as e:
         return {"status": "error", "message": str(e)}
@@ -49,10 +59,11 @@ async def batch_enhance_events(current_user: dict = Depends(get_current_user)):
 async def get_unprocessed_events_count(current_user: dict = Depends(get_current_user)):
     """Get count of events that haven't been processed by NLP agent yet."""
     try:
-        unprocessed = get_unprocessed_events()
+        unprocessed = get_unprocessed_events(limit=10)
         return {
             "status": "success",
-            "unprocessed_count": len(unprocessed),
+            "unprocessed_count": count_pending_events("nlp"),
+            "status_counts": get_status_counts("nlp"),
             "events": [
                 {
                     "id": event.id,
@@ -61,8 +72,39 @@ async def get_unprocessed_events_count(current_user: dict = Depends(get_current_
                     "has_tags": event.tags is not None,
                     "has_event_type": event.event_type is not None
                 }
-                for event in unprocessed[:10]  # Limit to first 10 for response size
+                for event in unprocessed  # Limit to first 10 for response size
             ]
         }
     except Exception as e:
-        return {"status": "error", "message": str(e)}
\ No newline at end of file
+        return {"status": "error", "message": str(e)}
+
+@router.get("/nlp-cache")
+def nlp_cache_stats(current_user: dict = Depends(get_current_user)):
+    """Size and hit count of the NLP result cache for the current pipeline version."""
+    try:
+        return {"status": "success", **get_cache_stats()}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+@router.get("/ready")
+def nlp_ready(response: Response):
+    """Readiness of the NLP models (public, for load balancer probes).
+
+    Returns 503 only while a startup warm-up (NLP_WARMUP_ON_STARTUP) is loading
+    the local models. With lazy loading, or when the inference sidecar serves the
+    models, the process is ready and the body reports the model state.
+    """
+    status = get_model_status()
+    if NLP_INFERENCE_URL:
+        from agents.inference_sidecar import sidecar_client
+        status["sidecar"] = sidecar_client.health()
+        status["ready"] = bool(status["sidecar"].get("ready"))
+    elif NLP_WARMUP_ON_STARTUP and not status["ready"]:
+        response.status_code = 503
+    return status
+
+@router.post("/warmup")
+def nlp_warmup(current_user: dict = Depends(get_current_user)):
+    """Start loading the NLP models in the background."""
+    start_background_warmup()
+    return {"status": "success", "message": "NLP model warm-up started"}
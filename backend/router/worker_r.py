@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends
+from auth.google_auth import get_current_user
+from agents.worker import get_job_status
+from agents.llm_gateway import get_usage_stats
+from agents.single_flight import llm_flight, geocode_flight, agent_flight
+from agents.resilience import get_breaker_stats
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.get("/status")
+def worker_status(history: int = 5, current_user: dict = Depends(get_current_user)):
+    """Latest runs of the background agent worker's jobs."""
+    try:
+        return get_job_status(max(1, min(history, 50)))
+    except Exception as e:
+        logger.error(f"Error reading worker status: {e}")
+        return {"status": "error", "message": "Could not read worker status"}
+
+@router.get("/llm-usage")
+def llm_usage(current_user: dict = Depends(get_current_user)):
+    """Per-agent Gemini call counts, retries, latency and token usage since process start."""
+    return {"status": "success", "agents": get_usage_stats()}
+
+@router.get("/single-flight")
+def single_flight_stats(current_user: dict = Depends(get_current_user)):
+    """How many identical concurrent calls were served by an already in-flight call."""
+    return {
+        "status": "success",
+        "llm": llm_flight.stats(),
+        "geocode": geocode_flight.stats(),
+        "agents": agent_flight.stats()
+    }
+
+@router.get("/breakers")
+def breaker_status(current_user: dict = Depends(get_current_user)):
+    """Circuit breaker state and recent latency for each external dependency."""
+    return {"status": "success", "breakers": get_breaker_stats()}